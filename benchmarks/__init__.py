@@ -0,0 +1,8 @@
+"""Transport benchmarks runnable without TouchDesigner.
+
+A fake TouchDesigner (fake_td.py) speaks the three protocols used by the
+servers of this repository; run.py drives each server's tool paths against it
+and reports latency percentiles and throughput:
+
+    python -m benchmarks --latency-ms 1 --reply-size 1024 --json results.json
+"""
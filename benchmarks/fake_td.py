@@ -0,0 +1,200 @@
+"""Fake TouchDesigner endpoint speaking the three protocols of this repository.
+
+- json socket: newline-delimited JSON commands of server/td_connector.py,
+  including the "hello" negotiation (length-prefixed framing, msgpack),
+  multiplexing ids and execute_batch;
+- python socket: wrapped Python scripts of mcp-server/server.py, answered
+  with one JSON line;
+- http: GET/POST /api/run of touchdesigner-mcp-server.
+
+Nothing is executed: every command sleeps `latency` seconds and answers with
+a value of `reply_size` characters. Like TouchDesigner, which runs scripts on
+its main thread, commands are served one at a time unless serial=False.
+"""
+from typing import Any, Dict, Optional
+import http.server
+import json
+import socketserver
+import threading
+import time
+import urllib.parse
+
+from benchmarks.loader import load_module
+
+framing = load_module("framing", "server", "framing.py")
+codec = load_module("codec", "server", "codec.py")
+
+# Last line of every script sent by mcp-server (see wrap_command there)
+PYTHON_TRAILER = b"json.dumps(__td_response)\n"
+
+class FakeTouchDesigner:
+    """Three listening sockets answering like TouchDesigner would, after a fixed latency."""
+
+    def __init__(self, host: str = "127.0.0.1", latency: float = 0.0, reply_size: int = 64,
+                 serial: bool = True, json_port: int = 0, python_port: int = 0, http_port: int = 0):
+        self.host = host
+        self.latency = latency
+        self.reply_size = reply_size
+        self.serial = serial
+        self.value = "x" * reply_size
+        self.commands = 0
+        self._main_thread = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._servers = [
+            _TCPServer((host, json_port), _JsonSocketHandler, self),
+            _TCPServer((host, python_port), _PythonSocketHandler, self),
+            _HTTPServer((host, http_port), _HTTPHandler, self),
+        ]
+        self._threads = []
+
+    @property
+    def json_port(self) -> int:
+        return self._servers[0].server_address[1]
+
+    @property
+    def python_port(self) -> int:
+        return self._servers[1].server_address[1]
+
+    @property
+    def http_port(self) -> int:
+        return self._servers[2].server_address[1]
+
+    def start(self) -> "FakeTouchDesigner":
+        for server in self._servers:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self) -> "FakeTouchDesigner":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def execute(self, count: int = 1) -> None:
+        """Spend the configured latency once per command, on the "main thread" when serial."""
+        with self._counter_lock:
+            self.commands += count
+        if self.latency <= 0:
+            return
+        if self.serial:
+            with self._main_thread:
+                time.sleep(self.latency * count)
+        else:
+            time.sleep(self.latency * count)
+
+    def json_reply(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        if command.get("action") == "execute_batch":
+            commands = command.get("commands") or []
+            self.execute(len(commands))
+            return {"results": [{"success": True, "result": {"value": self.value}} for _ in commands],
+                    "td_exec_ms": self.latency * 1000 * len(commands)}
+        self.execute()
+        return {"success": True, "result": {"value": self.value}, "td_exec_ms": self.latency * 1000}
+
+    def python_reply(self, script: Optional[str] = None) -> bytes:
+        self.execute()
+        # Shaped to satisfy both raw expressions and get_parameter-style procedures
+        return json.dumps({"result": {"value": self.value, "constant": False}, "error": None,
+                           "exec_ms": self.latency * 1000}).encode('utf-8')
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler, td):
+        self.td = td
+        super().__init__(address, handler)
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler, td):
+        self.td = td
+        super().__init__(address, handler)
+
+
+class _JsonSocketHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        td = self.server.td
+        mode, frame_codec = framing.NEWLINE, codec.get_codec("json")
+        reader = framing.FrameReader(mode)
+        while True:
+            try:
+                frame = reader.read_frame(self.request)
+            except (ConnectionError, OSError, framing.FrameTooLarge):
+                return
+            command = frame_codec.decode(frame)
+            if isinstance(command, dict) and command.get("action") == "hello":
+                offered = [name for name in command.get("codecs", ["json"]) if name in codec.available_codecs()]
+                reply = {"framing": command.get("framing", framing.NEWLINE),
+                         "max_frame_size": command.get("max_frame_size", framing.DEFAULT_MAX_FRAME_SIZE),
+                         "codec": offered[0] if offered else "json"}
+                self.request.sendall(framing.encode_frame(json.dumps(reply).encode('utf-8')))
+                mode, frame_codec = reply["framing"], codec.get_codec(reply["codec"])
+                reader = framing.FrameReader(mode, reply["max_frame_size"])
+                continue
+            response = td.json_reply(command)
+            if "id" in command:
+                response["id"] = command["id"]
+            self.request.sendall(framing.encode_frame(frame_codec.encode(response), mode))
+
+
+class _PythonSocketHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        td = self.server.td
+        buffer = bytearray()
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            end = buffer.find(PYTHON_TRAILER)
+            while end != -1:
+                del buffer[:end + len(PYTHON_TRAILER)]
+                self.request.sendall(td.python_reply() + b"\n")
+                end = buffer.find(PYTHON_TRAILER)
+
+
+class _HTTPHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: without this, Nagle's algorithm
+    # and delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def _reply(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/api/run":
+            return self._reply(404, b'{"error": "not found"}')
+        script = urllib.parse.parse_qs(url.query).get("script", [""])[0]
+        self._reply(200, self.server.td.python_reply(script))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path != "/api/run":
+            return self._reply(404, b'{"error": "not found"}')
+        script = json.loads(body or b"{}").get("script", "")
+        self._reply(200, self.server.td.python_reply(script))
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,261 @@
+"""Load generator for the Flask JSON-RPC server (server/server.py).
+
+Concurrent keep-alive clients send a weighted mix of JSON-RPC calls on "/"
+(tools_execute, resources_list, system_status) and GET /mcp/tools for a fixed
+duration. By default the server runs in this process against the fake
+TouchDesigner, which also gives access to the time requests spent waiting for
+a TouchDesigner connection; --url targets an already running server instead.
+
+    python -m benchmarks.load --concurrency 16 --duration 10 --json load.json
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+from benchmarks.fake_td import FakeTouchDesigner
+from benchmarks.loader import load_module
+from benchmarks.run import percentile
+
+DEFAULT_MIX = "tools_execute=6,resources_list=2,system_status=1,mcp_tools=1"
+KINDS = ("tools_execute", "resources_list", "system_status", "mcp_tools")
+
+def parse_mix(text: str) -> List[Tuple[str, float]]:
+    """Parse "kind=weight,..." into a list of (kind, weight)."""
+    mix = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind: {kind} (expected one of {', '.join(KINDS)})")
+        mix.append((kind, float(weight or 1)))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError("The request mix needs at least one positive weight")
+    return mix
+
+def build_request(kind: str, tool: str, payload_size: int, request_id: int) -> Tuple[str, str, Optional[bytes]]:
+    """(method, path, body) of one request of the given kind."""
+    if kind == "mcp_tools":
+        return "GET", "/mcp/tools", None
+    call: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": kind}
+    if kind == "tools_execute":
+        call["params"] = {"tool_name": tool, "parameters": {
+            "operator_path": "/project1/text1", "parameter_name": "text", "value": "x" * payload_size}}
+    return "POST", "/", json.dumps(call).encode('utf-8')
+
+def is_error(status: int, body: bytes) -> bool:
+    """HTTP failures, JSON-RPC errors and tool results carrying an error."""
+    if status >= 400:
+        return True
+    if not body:
+        return False
+    try:
+        reply = json.loads(body)
+    except ValueError:
+        return True
+    if isinstance(reply, dict):
+        if "error" in reply:
+            return True
+        result = reply.get("result")
+        inner = result.get("result") if isinstance(result, dict) else None
+        return isinstance(inner, dict) and "error" in inner
+    return False
+
+class Recorder:
+    """Latencies and error counts per request kind, shared by the client threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+
+    def record(self, kind: str, seconds: float, error: bool, failure: Optional[str] = None) -> None:
+        with self._lock:
+            self.latencies.setdefault(kind, []).append(seconds)
+            if error:
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+            if failure is not None:
+                self.failures[failure] = self.failures.get(failure, 0) + 1
+
+def latency_summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p90": round(percentile(latencies, 0.90) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+def client(url: urllib.parse.SplitResult, args: argparse.Namespace, mix: List[Tuple[str, float]],
+           deadline: float, recorder: Recorder, seed: int) -> None:
+    """One keep-alive client sending random requests from the mix until the deadline."""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in mix]
+    weights = [weight for _, weight in mix]
+    conn = None
+    request_id = 0
+    while time.monotonic() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        request_id += 1
+        method, path, body = build_request(kind, args.tool, args.payload_size, request_id)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=args.timeout)
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            if response.will_close:
+                conn.close()
+                conn = None
+            recorder.record(kind, time.perf_counter() - started, is_error(response.status, data))
+        except Exception as e:
+            recorder.record(kind, time.perf_counter() - started, True, failure=type(e).__name__)
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+def start_local_server(args: argparse.Namespace, td: FakeTouchDesigner):
+    """Run server/server.py in this process, its connector pointed at the fake TouchDesigner."""
+    from werkzeug.serving import make_server
+    os.environ["TD_HOST"] = "127.0.0.1"
+    os.environ["TD_PORT"] = str(td.json_port)
+    os.environ["TD_POOL_SIZE"] = str(args.pool_size)
+    os.environ["TD_MULTIPLEX"] = "1" if args.multiplex else "0"
+    # Keep the cost of the server's logging pipeline, but not its console output
+    os.environ["MCP_LOG_FILE"] = args.server_log
+    app_module = load_module("flask_server_app", "server", "server.py")
+    httpd = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return app_module, httpd
+
+def run(args: argparse.Namespace, mix: List[Tuple[str, float]]) -> Dict[str, Any]:
+    recorder = Recorder()
+    td = httpd = app_module = None
+    if args.url:
+        url = urllib.parse.urlsplit(args.url)
+    else:
+        td = FakeTouchDesigner(latency=args.latency_ms / 1000, reply_size=args.reply_size,
+                               serial=not args.parallel_td).start()
+        app_module, httpd = start_local_server(args, td)
+        url = urllib.parse.urlsplit(f"http://127.0.0.1:{httpd.server_port}")
+    try:
+        wait_before = app_module.td_connector.pool_stats()["wait"] if app_module else None
+        deadline = time.monotonic() + args.duration
+        threads = [threading.Thread(target=client, args=(url, args, mix, deadline, recorder, args.seed + i))
+                   for i in range(args.concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stats = app_module.td_connector.pool_stats() if app_module else None
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+        if app_module is not None:
+            app_module.td_connector.close()
+        if td is not None:
+            td.stop()
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    report: Dict[str, Any] = {
+        "config": {key: getattr(args, key) for key in
+                   ("url", "concurrency", "duration", "mix", "tool", "payload_size", "latency_ms",
+                    "reply_size", "parallel_td", "pool_size", "multiplex", "seed")},
+        "elapsed_s": round(elapsed, 3),
+        "total": latency_summary(all_latencies, sum(recorder.errors.values()), elapsed),
+        "by_kind": {kind: latency_summary(values, recorder.errors.get(kind, 0), elapsed)
+                    for kind, values in sorted(recorder.latencies.items())},
+        "client_failures": recorder.failures,
+        "connector": None,
+    }
+    if stats is not None:
+        wait = stats["wait"]
+        waits = wait["count"] - wait_before["count"]
+        wait_total = wait["total_seconds"] - wait_before["total_seconds"]
+        # Time requests spent waiting for a pooled connection (or multiplexing slot)
+        report["connector"] = {
+            "acquires": waits,
+            "wait_total_s": round(wait_total, 6),
+            "wait_mean_ms": round(wait_total / waits * 1000, 3) if waits else 0.0,
+            "wait_max_ms": round(wait["max_seconds"] * 1000, 3),
+            "wait_share_of_request_time": round(wait_total / sum(all_latencies), 4) if all_latencies else 0.0,
+            "pool": {key: value for key, value in stats.items() if key != "wait"},
+        }
+    return report
+
+def print_summary(report: Dict[str, Any], out=sys.stderr) -> None:
+    header = f"{'kind':<16} {'requests':>8} {'err %':>7} {'rps':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    rows = list(report["by_kind"].items()) + [("total", report["total"])]
+    for kind, summary in rows:
+        latency = summary["latency_ms"]
+        print(f"{kind:<16} {summary['requests']:>8} {summary['error_rate'] * 100:>7.2f} {summary['throughput_rps']:>9.1f} "
+              f"{latency['p50']:>9.3f} {latency['p90']:>9.3f} {latency['p99']:>9.3f}", file=out)
+    if report["connector"] is not None:
+        connector = report["connector"]
+        print(f"connector wait: {connector['wait_total_s']:.3f}s over {connector['acquires']} acquires "
+              f"(mean {connector['wait_mean_ms']:.3f}ms, max {connector['wait_max_ms']:.3f}ms)", file=out)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server (default: start one in-process)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default: 10)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted request kinds (default: {DEFAULT_MIX})")
+    parser.add_argument("--tool", default="set_parameter", help="Tool called by tools_execute (default: set_parameter)")
+    parser.add_argument("--payload-size", type=int, default=64,
+                        help="Characters in the tools_execute value parameter (default: 64)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client timeout in seconds (default: 30)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the request mix (default: 0)")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Fake TouchDesigner time per command (default: 1)")
+    parser.add_argument("--reply-size", type=int, default=64, help="Characters in each fake reply (default: 64)")
+    parser.add_argument("--parallel-td", action="store_true",
+                        help="Let the fake TouchDesigner serve commands in parallel instead of one at a time")
+    parser.add_argument("--pool-size", type=int, default=4, help="TD_POOL_SIZE of the in-process server (default: 4)")
+    parser.add_argument("--multiplex", action="store_true", help="TD_MULTIPLEX=1 for the in-process server")
+    parser.add_argument("--server-log", default=os.devnull, help="Log file of the in-process server (default: discarded)")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON ('-' for stdout)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    report = run(args, mix)
+    print_summary(report)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
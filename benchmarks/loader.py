@@ -0,0 +1,37 @@
+"""Import the servers' modules side by side.
+
+The three servers are flat script directories whose modules share names
+(server.py, pagination.py, ...), so they cannot all be put on sys.path.
+"""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_module(alias, directory, filename):
+    """Import `directory/filename` as module `alias`, resolving its siblings in `directory`."""
+    directory = os.path.join(REPO_ROOT, directory)
+    if alias in sys.modules:
+        return sys.modules[alias]
+    # Forget same-named siblings imported from another server directory
+    siblings = {os.path.splitext(name)[0] for name in os.listdir(directory)
+                if name.endswith(".py") or os.path.isdir(os.path.join(directory, name))}
+    for name in siblings:
+        module = sys.modules.get(name)
+        module_file = getattr(module, "__file__", None) or ""
+        if module is not None and not os.path.abspath(module_file).startswith(directory + os.sep):
+            del sys.modules[name]
+    sys.path.insert(0, directory)
+    try:
+        spec = importlib.util.spec_from_file_location(alias, os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[alias] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[alias]
+            raise
+    finally:
+        sys.path.remove(directory)
+    return module
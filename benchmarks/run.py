@@ -0,0 +1,251 @@
+"""Benchmark every transport's tool paths against the fake TouchDesigner.
+
+Each case is timed call by call from `concurrency` clients; the report gives
+p50/p99 latency and ops/sec per case. With --baseline, the run fails (exit
+status 1) when a case got slower than the baseline by more than
+--max-regression, so it can gate CI.
+"""
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+
+from benchmarks.fake_td import FakeTouchDesigner
+from benchmarks.loader import load_module
+
+TRANSPORTS = ("server", "mcp-server", "http")
+OP_PATH = "/project1/noise1"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(name: str, latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+def is_error(result: Any) -> bool:
+    """Whether a tool or connector result reports a failure."""
+    if isinstance(result, list):
+        return any(is_error(item) for item in result)
+    if isinstance(result, dict):
+        return result.get("success") is False or bool(result.get("error"))
+    return False
+
+def measure_sync(name: str, call: Callable[[], Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Time `requests` calls of a blocking function spread over `concurrency` threads."""
+    for _ in range(warmup):
+        call()
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = [0]
+
+    def worker():
+        while next(counter) < requests:
+            started = time.perf_counter()
+            try:
+                failed = is_error(call())
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            if failed:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return summarize(name, latencies, errors[0], time.perf_counter() - started)
+
+async def measure_async(name: str, call: Callable[[], Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Time `requests` awaits of a coroutine function spread over `concurrency` tasks."""
+    for _ in range(warmup):
+        await call()
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while next(counter) < requests:
+            started = time.perf_counter()
+            try:
+                failed = is_error(await call())
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            if failed:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(name, latencies, errors, time.perf_counter() - started)
+
+def bench_server(td: FakeTouchDesigner, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """server/td_connector.py: newline-JSON socket, pooled, multiplexed and msgpack variants."""
+    td_connector = load_module("td_connector", "server", "td_connector.py")
+    codec = load_module("codec", "server", "codec.py")
+    variants = [("", {}), ("[multiplex]", {"multiplex": True})]
+    if "msgpack" in codec.available_codecs():
+        variants.append(("[msgpack]", {"codec": "msgpack"}))
+    results = []
+    for suffix, options in variants:
+        connector = td_connector.TouchDesignerConnector("127.0.0.1", td.json_port, pool_size=args.concurrency, **options)
+        try:
+            cases = [
+                ("get_parameter", lambda: connector.execute_tool("get_parameter", {"op_path": OP_PATH, "parameter": "amp"})),
+                ("set_parameter", lambda: connector.execute_tool("set_parameter", {"op_path": OP_PATH, "parameter": "amp", "value": 0.5})),
+                ("execute_batch(10)", lambda: connector.execute_batch(
+                    [{"tool_name": "set_parameter", "parameters": {"op_path": OP_PATH, "parameter": f"p{i}", "value": i}}
+                     for i in range(10)])),
+            ]
+            if suffix:
+                cases = cases[:1]
+            for case, call in cases:
+                results.append(measure_sync(f"server/{case}{suffix}", call, args.requests, args.concurrency, args.warmup))
+        finally:
+            connector.close()
+    return results
+
+def bench_mcp_server(td: FakeTouchDesigner, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """mcp-server/server.py: wrapped Python scripts over the raw socket, through the tools."""
+    app = load_module("mcp_server_app", "mcp-server", "server.py")
+    cases = [
+        ("get_parameter", lambda: app.get_parameter(OP_PATH, "amp", use_cache=False)),
+        ("set_parameter", lambda: app.set_parameter(OP_PATH, "amp", 0.5, coalesce=False)),
+        ("execute_python", lambda: app.execute_python("1 + 1")),
+    ]
+
+    async def run() -> List[Dict[str, Any]]:
+        if not await app.connect_to_touchdesigner("127.0.0.1", td.python_port):
+            raise ConnectionError(f"Cannot connect to the fake TouchDesigner on port {td.python_port}")
+        try:
+            return [await measure_async(f"mcp-server/{case}", call, args.requests, args.concurrency, args.warmup)
+                    for case, call in cases]
+        finally:
+            await app.disconnect_from_touchdesigner()
+
+    return asyncio.run(run())
+
+def bench_http(td: FakeTouchDesigner, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """touchdesigner-mcp-server: /api/run over keep-alive HTTP, through the tools.
+
+    Its tools always address the web server on port 9980, so the fake must
+    listen there (see --http-port).
+    """
+    app = load_module("td_control_server_app", "touchdesigner-mcp-server", "touchdesigner_control_server.py")
+    cases = [
+        ("get_parameter", lambda: app.get_parameter(OP_PATH, "amp")),
+        ("set_parameter", lambda: app.set_parameter(OP_PATH, "amp", 0.5)),
+        ("execute_python", lambda: app.execute_python("1 + 1")),
+    ]
+
+    async def run() -> List[Dict[str, Any]]:
+        if not app.connect_to_touchdesigner("127.0.0.1", td.http_port):
+            raise ConnectionError(f"Cannot connect to the fake TouchDesigner on port {td.http_port}")
+        try:
+            return [await measure_async(f"http/{case}", call, args.requests, args.concurrency, args.warmup)
+                    for case, call in cases]
+        finally:
+            app.disconnect_from_touchdesigner()
+
+    return asyncio.run(run())
+
+BENCHMARKS = {"server": bench_server, "mcp-server": bench_mcp_server, "http": bench_http}
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Cases slower than the baseline beyond the allowed regression."""
+    previous = {case["name"]: case for case in baseline.get("results", [])}
+    regressions = []
+    for case in results:
+        before = previous.get(case["name"])
+        if before is None:
+            continue
+        if before["p99_ms"] > 0 and case["p99_ms"] > before["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{case['name']}: p99 {before['p99_ms']}ms -> {case['p99_ms']}ms")
+        if case["ops_per_sec"] < before["ops_per_sec"] * (1 - max_regression):
+            regressions.append(f"{case['name']}: {before['ops_per_sec']} -> {case['ops_per_sec']} ops/sec")
+    return regressions
+
+def print_table(results: List[Dict[str, Any]], out=sys.stdout) -> None:
+    header = f"{'case':<42} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p99 ms':>9} {'ops/sec':>10}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for case in results:
+        print(f"{case['name']:<42} {case['requests']:>8} {case['errors']:>6} "
+              f"{case['p50_ms']:>9.3f} {case['p99_ms']:>9.3f} {case['ops_per_sec']:>10.1f}", file=out)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--transports", default=",".join(TRANSPORTS),
+                        help="Comma-separated subset of: " + ", ".join(TRANSPORTS))
+    parser.add_argument("--requests", type=int, default=500, help="Timed calls per case (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent clients (default: 1)")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed calls per case (default: 20)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake TouchDesigner time per command (default: 0)")
+    parser.add_argument("--reply-size", type=int, default=64, help="Characters in each reply value (default: 64)")
+    parser.add_argument("--parallel-td", action="store_true",
+                        help="Let the fake TouchDesigner serve commands in parallel instead of one at a time")
+    parser.add_argument("--http-port", type=int, default=9980, help="Port of the fake web server (default: 9980)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, as a fraction (default: 0.25)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    transports = [name.strip() for name in args.transports.split(",") if name.strip()]
+    unknown = [name for name in transports if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown transports: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    results: List[Dict[str, Any]] = []
+    skipped: Dict[str, str] = {}
+    with FakeTouchDesigner(latency=args.latency_ms / 1000, reply_size=args.reply_size,
+                           serial=not args.parallel_td, http_port=args.http_port) as td:
+        for name in transports:
+            try:
+                results.extend(BENCHMARKS[name](td, args))
+            except ImportError as e:
+                # e.g. the mcp package is not installed for the FastMCP servers
+                skipped[name] = str(e)
+                print(f"Skipping {name}: {e}", file=sys.stderr)
+
+    print_table(results)
+    report = {
+        "config": {key: getattr(args, key) for key in
+                   ("requests", "concurrency", "warmup", "latency_ms", "reply_size", "parallel_td")},
+        "results": results,
+        "skipped": skipped,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
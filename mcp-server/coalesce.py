@@ -0,0 +1,87 @@
+"""Latest-wins coalescing of high-rate parameter writes."""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+
+class WriteCoalescer:
+    """Buffer parameter writes per (operator, parameter) and flush them as one batch.
+
+    Writes arriving within `window` seconds of the first buffered write are merged:
+    only the latest value of each parameter is sent, and the callers whose value
+    was overwritten are answered immediately as superseded. Flushes run one at a
+    time, so writes queued while a batch is in flight are coalesced too instead of
+    piling up behind it.
+    """
+
+    def __init__(self, flush: Callable[[List[list]], Awaitable[Dict[str, Any]]],
+                 window: float = 0.016):
+        self.flush = flush
+        self.window = window
+        self.enabled = False
+        self._pending: Dict[Tuple[str, str], list] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    async def submit(self, op_path: str, parameter: str, value: Any) -> Dict[str, Any]:
+        """Queue a write and wait until it is flushed or superseded."""
+        loop = asyncio.get_running_loop()
+        key = (op_path, parameter)
+        future = loop.create_future()
+        superseded = 0
+        previous = self._pending.get(key)
+        if previous is not None:
+            _, previous_future, superseded = previous
+            superseded += 1
+            self.dropped += 1
+            if not previous_future.done():
+                previous_future.set_result({"success": True, "error": None, "superseded": True})
+        self._pending[key] = [value, future, superseded]
+        self.submitted += 1
+        if self._timer is None:
+            self._timer = loop.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        async with self._flush_lock:
+            # Swap the buffer only now: writes queued while the previous batch
+            # was in flight are coalesced into this one
+            pending, self._pending = self._pending, {}
+            self._timer = None
+            if not pending:
+                return
+            keys = list(pending)
+            entries = [[op_path, parameter, pending[(op_path, parameter)][0]] for op_path, parameter in keys]
+            dropped = sum(item[2] for item in pending.values())
+            self.flushes += 1
+            try:
+                command_result = await self.flush(entries)
+            except Exception as e:
+                command_result = {"success": False, "result": None, "error": str(e)}
+
+        statuses = command_result.get("result")
+        if not command_result["success"] or not isinstance(statuses, list) or len(statuses) != len(keys):
+            statuses = [command_result.get("error") or f"Unexpected reply from TouchDesigner: {statuses}"] * len(keys)
+        for key, error in zip(keys, statuses):
+            _, future, superseded = pending[key]
+            if not future.done():
+                future.set_result({
+                    "success": error is None,
+                    "error": error,
+                    "superseded": False,
+                    "coalesced_writes": superseded,
+                    "batch_size": len(keys),
+                    "batch_dropped": dropped,
+                })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
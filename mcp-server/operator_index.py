@@ -0,0 +1,136 @@
+"""In-memory index of the TouchDesigner operator tree."""
+from typing import Any, Dict, Iterator, List, Optional
+import time
+import uuid
+
+class OperatorIndex:
+    """Operator tree mirrored from TouchDesigner and refreshed incrementally.
+
+    TouchDesigner computes a signature for every COMP covering its children and,
+    recursively, their subtrees, and keeps the signatures it last sent to this
+    index (identified by `client_id`). A refresh only sends the generation of the
+    last reply applied; TouchDesigner returns the child lists of COMPs whose
+    signature changed since then, or the whole tree if it no longer has that
+    generation, so unchanged subtrees cost nothing on the wire.
+
+    Operators created or deleted by this server are mirrored locally with add()
+    and remove(); only edits it cannot mirror (arbitrary scripts) mark the index
+    dirty and force the next lookup to refresh.
+    """
+
+    def __init__(self, max_age: float = 1.0):
+        self.max_age = max_age
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.signatures: Dict[str, int] = {}
+        self.client_id = uuid.uuid4().hex
+        self.generation = 0
+        self.refreshed_at: Optional[float] = None
+        self.dirty = True
+        # Bumped whenever the mirrored tree changes, so derived indexes know when to rebuild
+        self.version = 0
+        self.refreshes = 0
+        self.comps_resent = 0
+
+    def needs_refresh(self) -> bool:
+        if self.dirty or self.refreshed_at is None:
+            return True
+        return time.monotonic() - self.refreshed_at > self.max_age
+
+    def mark_dirty(self) -> None:
+        """Force the next lookup to refresh from TouchDesigner."""
+        self.dirty = True
+
+    def clear(self) -> None:
+        self.nodes.clear()
+        self.children.clear()
+        self.signatures.clear()
+        # A new identity: TouchDesigner starts over with a full tree
+        self.client_id = uuid.uuid4().hex
+        self.generation = 0
+        self.refreshed_at = None
+        self.dirty = True
+        self.version += 1
+
+    def _remove_subtree(self, path: str) -> None:
+        for child in self.children.pop(path, []):
+            self._remove_subtree(child)
+        self.nodes.pop(path, None)
+        self.signatures.pop(path, None)
+
+    def _remove_subtree_children(self, path: str) -> None:
+        for child in self.children.pop(path, []):
+            self._remove_subtree(child)
+        self.signatures.pop(path, None)
+
+    def apply(self, changed: Dict[str, list], generation: int = 0) -> None:
+        """Apply a refresh reply: {comp_path: [signature, [[path, name, type, family, is_comp], ...]]}."""
+        for comp_path, (signature, entries) in changed.items():
+            new_children = [entry[0] for entry in entries]
+            kept = set(new_children)
+            for old_child in self.children.get(comp_path, []):
+                if old_child not in kept:
+                    self._remove_subtree(old_child)
+            for path, name, op_type, family, is_comp in entries:
+                self.nodes[path] = {"name": name, "path": path, "type": op_type,
+                                    "family": family, "parent": comp_path, "isCOMP": is_comp}
+                if not is_comp:
+                    self._remove_subtree_children(path)
+            self.children[comp_path] = new_children
+            self.signatures[comp_path] = signature
+        if changed:
+            self.version += 1
+        self.comps_resent += len(changed)
+        self.generation = generation
+        self.refreshes += 1
+        self.refreshed_at = time.monotonic()
+        self.dirty = False
+
+    def add(self, node: Dict[str, Any]) -> None:
+        """Mirror an operator created by this server.
+
+        TouchDesigner still holds the parent's previous signature: the next refresh
+        reports the parent as changed and reconciles its children.
+        """
+        path, parent = node["path"], node["parent"]
+        siblings = self.children.setdefault(parent, [])
+        if path not in siblings:
+            siblings.append(path)
+        self.nodes[path] = node
+        self.version += 1
+
+    def remove(self, path: str) -> None:
+        """Mirror the deletion of an operator (and its subtree) by this server."""
+        node = self.nodes.get(path)
+        if node is not None and path in self.children.get(node["parent"], []):
+            self.children[node["parent"]].remove(path)
+        self._remove_subtree(path)
+        self.version += 1
+
+    def contains(self, path: str) -> bool:
+        return path in self.nodes or path in self.children
+
+    def iter(self, parent_path: str = "/", depth: Optional[int] = 1) -> Iterator[Dict[str, Any]]:
+        """Operators under parent_path, depth-first, down to `depth` levels (None: all)."""
+        parent_path = parent_path.rstrip("/") or "/"
+        stack = [(child, 1) for child in reversed(self.children.get(parent_path, []))]
+        while stack:
+            path, level = stack.pop()
+            node = self.nodes.get(path)
+            if node is None:
+                continue
+            yield node
+            if depth is None or level < depth:
+                stack.extend((child, level + 1) for child in reversed(self.children.get(path, [])))
+
+    def list(self, parent_path: str = "/", depth: Optional[int] = 1) -> List[Dict[str, Any]]:
+        return list(self.iter(parent_path, depth))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "operators": len(self.nodes),
+            "comps": len(self.signatures),
+            "refreshes": self.refreshes,
+            "comps_resent": self.comps_resent,
+            "age": time.monotonic() - self.refreshed_at if self.refreshed_at is not None else None,
+        }
@@ -0,0 +1,106 @@
+"""Client-side cache of TouchDesigner parameter values."""
+from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+import sys
+import time
+
+def estimate_size(value: Any) -> int:
+    """Rough memory footprint of a cached value, in bytes."""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+class ParameterCache:
+    """LRU cache of parameter values keyed by (operator path, parameter name).
+
+    Values read from constant-mode parameters are kept for `ttl` seconds (None:
+    until evicted or invalidated), so that edits made in TouchDesigner itself show
+    up after at most that delay; values of expression/export-driven parameters are
+    only kept for `expression_ttl` seconds, 0 meaning they are never cached.
+    Writes cache the value TouchDesigner reads back after storing it, not the
+    value sent, since TouchDesigner may coerce it.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: Optional[float] = 5.0, expression_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.expression_ttl = expression_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, op_path: str, parameter: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a parameter."""
+        key = (op_path, parameter)
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            self._remove(key)
+        self.misses += 1
+        return False, None
+
+    def put(self, op_path: str, parameter: str, value: Any, constant: bool = True) -> None:
+        """Store a parameter value, evicting least recently used entries over the caps."""
+        key = (op_path, parameter)
+        if key in self._entries:
+            self._remove(key)
+        ttl = self.ttl if constant else self.expression_ttl
+        if ttl is not None and ttl <= 0:
+            return
+        size = estimate_size(op_path) + estimate_size(parameter) + estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, op_path: Optional[str] = None, parameter: Optional[str] = None) -> int:
+        """Evict one parameter, every parameter of an operator and its children, or everything."""
+        if op_path is None:
+            count = len(self._entries)
+            self.clear()
+            return count
+        if parameter is not None:
+            if (op_path, parameter) in self._entries:
+                self._remove((op_path, parameter))
+                return 1
+            return 0
+        prefix = op_path.rstrip("/") + "/"
+        keys = [k for k in self._entries if k[0] == op_path or k[0].startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,139 @@
+"""In-process search index over operator paths and names."""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from bisect import bisect_left, insort
+from collections import defaultdict
+import fnmatch
+import re
+
+GLOB_CHARS = "*?["
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a lowercased, padded string."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _literal_prefix(pattern: str) -> str:
+    """Part of a glob pattern before its first wildcard."""
+    match = re.search(r"[*?\[]", pattern)
+    return pattern[:match.start()] if match else pattern
+
+class PathSearchIndex:
+    """Prefix, glob and fuzzy lookups of operator paths without a TouchDesigner round trip.
+
+    Paths and lowercased names are kept in sorted arrays so prefix queries are a
+    bisection; fuzzy queries rank names by shared trigrams through an inverted
+    index.
+    """
+
+    def __init__(self):
+        self.operators: Dict[str, Dict[str, Any]] = {}
+        self._paths: List[str] = []
+        self._names: List[Tuple[str, str]] = []
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.operators)
+
+    def rebuild(self, nodes: Iterable[Dict[str, Any]], version: Optional[int] = None) -> None:
+        """Replace the whole index with a network dump."""
+        self.operators = {node["path"]: node for node in nodes}
+        self._paths = sorted(self.operators)
+        self._names = sorted((node["name"].lower(), path) for path, node in self.operators.items())
+        self._grams = defaultdict(set)
+        for path, node in self.operators.items():
+            for gram in trigrams(node["name"]):
+                self._grams[gram].add(path)
+        self.version = version
+
+    def add(self, node: Dict[str, Any]) -> None:
+        """Index an operator created by this server."""
+        path = node["path"]
+        if path in self.operators:
+            self.remove(path, recursive=False)
+        self.operators[path] = node
+        insort(self._paths, path)
+        insort(self._names, (node["name"].lower(), path))
+        for gram in trigrams(node["name"]):
+            self._grams[gram].add(path)
+
+    def remove(self, path: str, recursive: bool = True) -> int:
+        """Forget an operator (and, by default, everything below it)."""
+        doomed = [path] if path in self.operators else []
+        if recursive:
+            doomed.extend(self._with_prefix(path.rstrip("/") + "/"))
+        for p in doomed:
+            node = self.operators.pop(p)
+            del self._paths[bisect_left(self._paths, p)]
+            del self._names[bisect_left(self._names, (node["name"].lower(), p))]
+            for gram in trigrams(node["name"]):
+                self._grams[gram].discard(p)
+        return len(doomed)
+
+    def _with_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self._paths, prefix)
+        end = bisect_left(self._paths, prefix + "\U0010ffff")
+        return self._paths[start:end]
+
+    def prefix(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Operators whose path (query starting with "/") or name starts with query."""
+        if query.startswith("/"):
+            return [self.operators[p] for p in self._with_prefix(query)[:limit]]
+        query = query.lower()
+        start = bisect_left(self._names, (query,))
+        matches = []
+        for name, path in self._names[start:]:
+            if not name.startswith(query) or len(matches) >= limit:
+                break
+            matches.append(self.operators[path])
+        return matches
+
+    def glob(self, pattern: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Operators whose path (pattern starting with "/") or name matches a glob pattern."""
+        regex = re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+        if pattern.startswith("/"):
+            candidates = self._with_prefix(_literal_prefix(pattern))
+            matches = (p for p in candidates if regex.match(p))
+        else:
+            matches = (p for p, node in self.operators.items() if regex.match(node["name"]))
+        result = []
+        for path in matches:
+            result.append(self.operators[path])
+            if len(result) >= limit:
+                break
+        return result
+
+    def fuzzy(self, query: str, limit: int = 20, min_score: float = 0.2) -> List[Dict[str, Any]]:
+        """Operators whose name is most similar to query, best first, with a score."""
+        name_query = query.rstrip("/").rsplit("/", 1)[-1]
+        grams = trigrams(name_query)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for path in self._grams.get(gram, ()):
+                shared[path] += 1
+        scored = []
+        for path, count in shared.items():
+            node = self.operators[path]
+            # Dice coefficient over trigrams, with a bonus for path containment
+            score = 2 * count / (len(grams) + len(trigrams(node["name"])))
+            if query.startswith("/") and path.startswith(query.rsplit("/", 1)[0] + "/"):
+                score += 0.1
+            if score >= min_score:
+                scored.append((score, path))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [dict(self.operators[path], score=round(min(score, 1.0), 3)) for score, path in scored[:limit]]
+
+    def search(self, query: str, mode: str = "auto", limit: int = 20) -> List[Dict[str, Any]]:
+        if mode == "auto":
+            if any(c in query for c in GLOB_CHARS):
+                mode = "glob"
+            else:
+                exact = self.prefix(query, limit)
+                return exact if exact else self.fuzzy(query, limit)
+        if mode == "prefix":
+            return self.prefix(query, limit)
+        if mode == "glob":
+            return self.glob(query, limit)
+        if mode == "fuzzy":
+            return self.fuzzy(query, limit)
+        raise ValueError(f"Unknown search mode: {mode}")
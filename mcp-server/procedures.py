@@ -0,0 +1,151 @@
+"""TouchDesigner-side procedures used by the MCP tools.
+
+Each procedure is the source of a function named ``__mcp_proc`` that is
+compiled once per connection inside TouchDesigner and stored in a
+``__mcp_procs`` registry there. Tools then invoke it by id with literal
+arguments instead of re-sending (and having TouchDesigner re-compile) the
+whole script on every call.
+"""
+from typing import Any, Dict
+import hashlib
+from mcp_common.screenshot import CAPTURE_NETWORK_PATH, ENCODE_IMAGE_PROCEDURE
+
+# Returned by an invocation when the procedure is not installed in TouchDesigner
+MISSING = "__mcp_missing__"
+
+PROCEDURES: Dict[str, str] = {
+    "get_parameter": '''
+def __mcp_proc(op_path, parameter):
+    p = getattr(op(op_path).par, parameter)
+    return {"value": p.eval(), "constant": p.mode == ParMode.CONSTANT}
+''',
+    "set_parameter": '''
+def __mcp_proc(op_path, parameter, value):
+    target = op(op_path)
+    setattr(target.par, parameter, value)
+    p = getattr(target.par, parameter)
+    # Value as stored by TouchDesigner (coerced to the parameter type)
+    return {"value": p.eval(), "constant": p.mode == ParMode.CONSTANT}
+''',
+    "set_parameters": '''
+def __mcp_proc(entries):
+    replies = []
+    for op_path, parameter, value in entries:
+        try:
+            target = op(op_path)
+            if target is None:
+                raise ValueError(f"Operator not found: {op_path}")
+            setattr(target.par, parameter, value)
+            p = getattr(target.par, parameter)
+            replies.append({"value": p.eval(), "constant": p.mode == ParMode.CONSTANT})
+        except Exception as e:
+            replies.append({"error": str(e)})
+    return replies
+''',
+    "delete_operator": '''
+def __mcp_proc(op_path):
+    op(op_path).destroy()
+    return True
+''',
+    "cook_operator": '''
+def __mcp_proc(op_path):
+    op(op_path).cook(force=True)
+    return True
+''',
+    "operator_tree": '''
+def __mcp_proc(root_path, client, generation):
+    import zlib
+    root = op(root_path)
+    if root is None:
+        raise ValueError(f"Operator not found: {root_path}")
+    # Signatures last sent to each client, kept here rather than re-sent by the client
+    snapshots = globals().setdefault("__mcp_procs", {}).setdefault("operator_tree:snapshots", {})
+    last = snapshots.pop(client, None)
+    known = last[2] if last is not None and last[:2] == (root_path, generation) else {}
+    computed = {}
+    def signature(comp):
+        # The screenshot helper network is not part of the user's project
+        children = [c for c in comp.children if c.path != %r]
+        parts = [(c.id, c.name, c.type, signature(c) if c.isCOMP else 0) for c in children]
+        sig = zlib.crc32(repr(parts).encode())
+        computed[comp.path] = (sig, children)
+        return sig
+    signature(root)
+    changed = {}
+    def collect(comp):
+        sig, children = computed[comp.path]
+        if known.get(comp.path) == sig:
+            return
+        changed[comp.path] = [sig, [[c.path, c.name, c.type, c.family, c.isCOMP] for c in children]]
+        for c in children:
+            if c.isCOMP:
+                collect(c)
+    collect(root)
+    generation += 1
+    snapshots[client] = (root_path, generation, {path: sig for path, (sig, _) in computed.items()})
+    # Only the most recent clients are remembered; the others get a full tree next time
+    for stale_client in list(snapshots)[:-8]:
+        del snapshots[stale_client]
+    return {"generation": generation, "changed": changed}
+''' % CAPTURE_NETWORK_PATH,
+    "get_operator_info": '''
+def __mcp_proc(op_path, parameters=None, param_offset=0, param_limit=None, include_labels=True,
+               include_children=True, non_default_only=False, summary=False):
+    operator = op(op_path)
+    if operator is None or not operator.valid:
+        return None
+    children = operator.children
+    info = {
+        "name": operator.name,
+        "path": operator.path,
+        "type": operator.type,
+        "family": operator.family,
+        "valid": operator.valid,
+        "cooking": operator.cooking,
+        "cookTime": operator.cookTime,
+        "numChildren": len(children),
+    }
+    pars = operator.pars(*parameters) if parameters else operator.pars()
+    if non_default_only:
+        pars = [p for p in pars if not p.isDefault]
+    info["numParameters"] = len(pars)
+    if summary:
+        return info
+    end = None if param_limit is None else param_offset + param_limit
+    selected = []
+    for p in pars[param_offset:end]:
+        entry = {"name": p.name, "value": p.eval()}
+        if include_labels:
+            entry["label"] = p.label
+            entry["style"] = p.style
+            entry["mode"] = str(p.mode)
+        selected.append(entry)
+    info["parameters"] = selected
+    if end is not None and end < len(pars):
+        info["nextParamOffset"] = end
+    if include_children:
+        info["childrenNames"] = [c.name for c in children]
+    return info
+''',
+    "encode_image": ENCODE_IMAGE_PROCEDURE,
+}
+
+def procedure_id(name: str) -> str:
+    """Registry key of a procedure, versioned by its source."""
+    digest = hashlib.sha1(PROCEDURES[name].encode('utf-8')).hexdigest()[:8]
+    return f"{name}@{digest}"
+
+def install_expression(name: str) -> str:
+    """Single Python expression that compiles and registers a procedure in TouchDesigner."""
+    return (
+        f"exec(compile({PROCEDURES[name]!r}, '<mcp:{name}>', 'exec'), globals()) or "
+        f"globals().setdefault('__mcp_procs', {{}})"
+        f".update({{{procedure_id(name)!r}: globals().pop('__mcp_proc')}}) or True"
+    )
+
+def invoke_expression(name: str, args: Dict[str, Any]) -> str:
+    """Single Python expression that calls an installed procedure by id."""
+    return (
+        f"(lambda __p: __p(**{args!r}) if __p else {MISSING!r})"
+        f"(globals().get('__mcp_procs', {{}}).get({procedure_id(name)!r}))"
+    )
@@ -1,61 +1,181 @@
 from typing import Any, Dict, List, Optional, Union
+import asyncio
 import subprocess
-import socket
 import json
 import time
 import os
+import sys
 from mcp.server.fastmcp import FastMCP
 
+# Modules shared by both FastMCP servers live in mcp_common/ at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_common.pagination import normalize_type_filter, paginate, parse_fields, split_operator_type
+from mcp_common.parameters import normalize_parameter_writes
+from mcp_common.screenshot import check_image_options, save_screenshot_command
+from mcp_common.tracing import record_span, span, traced
+from procedures import MISSING, install_expression, invoke_expression
+from param_cache import ParameterCache
+from coalesce import WriteCoalescer
+from operator_index import OperatorIndex
+from path_search import PathSearchIndex
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON backend
+    orjson = None
+
 # Initialize FastMCP server for controlling TouchDesigner
 mcp = FastMCP("touchdesigner_control")
 
 # Constants
 DEFAULT_TOUCHDESIGNER_PATH = r"C:\Program Files\Derivative\TouchDesigner\bin\TouchDesigner.exe"
 DEFAULT_PORT = 9980  # Default TouchDesigner Python port
+DEFAULT_POOL_SIZE = int(os.environ.get("TD_POOL_SIZE", 4))  # Concurrent connections to TouchDesigner
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get("TD_CONNECT_TIMEOUT", 5))  # Seconds
+DEFAULT_COMMAND_TIMEOUT = float(os.environ.get("TD_COMMAND_TIMEOUT", 30))  # Seconds
+DEFAULT_LAUNCH_TIMEOUT = 30  # Seconds to wait for a launched TouchDesigner to accept connections
+MAX_RESPONSE_SIZE = 64 * 1024 * 1024  # Largest reply accepted from TouchDesigner
+
+# Parameter values cached client-side: read by get_parameter, written through by set_parameter(s)
+param_cache = ParameterCache(
+    max_entries=int(os.environ.get("TD_PARAM_CACHE_ENTRIES", 4096)),
+    max_bytes=int(os.environ.get("TD_PARAM_CACHE_BYTES", 8 * 1024 * 1024)),
+    ttl=float(os.environ.get("TD_PARAM_CACHE_TTL", 5)),  # Seconds; edits made in TouchDesigner show up after at most this delay
+    expression_ttl=float(os.environ.get("TD_PARAM_CACHE_EXPRESSION_TTL", 0)),  # 0: never cached
+)
 
 # Global connection state
 connection = {
     "td_process": None,
-    "td_socket": None,
+    "pool": None,
     "host": "localhost",
     "port": DEFAULT_PORT,
     "connected": False,
     "project_path": None
 }
 
-def connect_to_touchdesigner(host="localhost", port=DEFAULT_PORT) -> bool:
+class TDStream:
+    """One stream connection to TouchDesigner and the procedures installed on it."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.procedures: set = set()
+
+    def usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+
+class TDStreamPool:
+    """Pool of asyncio stream connections to the TouchDesigner Python port.
+
+    Each command borrows one connection for its round trip, so concurrent tool
+    calls overlap instead of queueing behind a single socket, and the event loop
+    is never blocked on network I/O.
+    """
+
+    def __init__(self, host: str, port: int, size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.connect_timeout = connect_timeout
+        self._idle: List[TDStream] = []
+        self._slots = asyncio.Semaphore(self.size)
+        self.closed = False
+
+    async def open(self) -> TDStream:
+        """Open a new stream connection."""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, limit=MAX_RESPONSE_SIZE),
+            timeout=self.connect_timeout)
+        return TDStream(reader, writer)
+
+    async def acquire(self) -> TDStream:
+        """Borrow a connection, opening one if none is idle."""
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                stream = self._idle.pop()
+                if stream.usable():
+                    return stream
+                stream.close()
+            return await self.open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, stream: TDStream, healthy: bool = True) -> None:
+        """Return a connection to the pool, or drop it if it is unusable or the pool is closed."""
+        if healthy and not self.closed and not stream.writer.is_closing():
+            self._idle.append(stream)
+        else:
+            stream.close()
+        self._slots.release()
+
+    async def close(self) -> None:
+        """Close every idle connection; borrowed ones are closed when released."""
+        self.closed = True
+        idle, self._idle = self._idle, []
+        for stream in idle:
+            stream.close()
+            try:
+                await stream.writer.wait_closed()
+            except Exception:
+                pass
+
+async def connect_to_touchdesigner(host="localhost", port=DEFAULT_PORT) -> bool:
     """Establish a connection to TouchDesigner via Python socket."""
+    # Reconnecting replaces the pool: close the previous one so its sockets are not leaked
+    previous, connection["pool"] = connection["pool"], None
+    if previous is not None:
+        await previous.close()
+    pool = TDStreamPool(host, port)
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        connection["td_socket"] = sock
+        stream = await pool.acquire()
+        pool.release(stream)
+        connection["pool"] = pool
         connection["host"] = host
         connection["port"] = port
         connection["connected"] = True
+        param_cache.clear()
+        operator_index.clear()
+        path_search.rebuild([])
         return True
     except Exception as e:
         connection["connected"] = False
         return False
 
-def disconnect_from_touchdesigner() -> bool:
+async def disconnect_from_touchdesigner() -> bool:
     """Close the connection to TouchDesigner."""
-    if connection["td_socket"]:
+    if connection["pool"]:
         try:
-            connection["td_socket"].close()
+            await connection["pool"].close()
         except:
             pass
-    connection["td_socket"] = None
+    connection["pool"] = None
     connection["connected"] = False
+    param_cache.clear()
+    operator_index.clear()
+    path_search.rebuild([])
     return True
 
-def send_python_command(command: str) -> Dict[str, Any]:
-    """Send a Python command to TouchDesigner and get the result."""
-    if not connection["connected"] or not connection["td_socket"]:
-        return {"success": False, "result": None, "error": "Not connected to TouchDesigner"}
-    
-    try:
-        # Prepare the command for proper execution in TouchDesigner
-        wrapped_command = f"""
+def decode_json(data: bytes) -> Any:
+    """Decode a JSON reply, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+def wrap_command(command: str) -> str:
+    """Wrap a Python expression so TouchDesigner replies with a JSON result/error pair.
+
+    The reply also carries the time TouchDesigner spent evaluating the expression.
+    """
+    return f"""
+import time as __td_time
+__td_started = __td_time.perf_counter()
 try:
     __td_result = None
     __td_error = None
@@ -64,31 +184,157 @@ except Exception as e:
     __td_error = str(e)
 
 import json
-__td_response = {{"result": __td_result, "error": __td_error}}
+__td_response = {{"result": __td_result, "error": __td_error,
+                  "exec_ms": (__td_time.perf_counter() - __td_started) * 1000}}
 json.dumps(__td_response)
 """
-        connection["td_socket"].sendall(wrapped_command.encode('utf-8'))
-        
-        # Get response
-        data = b""
-        while True:
-            chunk = connection["td_socket"].recv(4096)
-            data += chunk
-            if chunk.endswith(b'\n') or not chunk:
-                break
-        
-        # Parse response
-        response_str = data.decode('utf-8').strip()
+
+async def _exchange(stream: TDStream, command: str) -> tuple:
+    """Write one wrapped command on a stream and read its newline-terminated reply."""
+    with span("send"):
+        stream.writer.write(wrap_command(command).encode('utf-8'))
+        await stream.writer.drain()
+    try:
+        with span("receive"):
+            return await stream.reader.readuntil(b'\n'), True
+    except asyncio.IncompleteReadError as e:
+        # Connection closed by TouchDesigner: use whatever arrived
+        return e.partial, False
+
+def parse_reply(data: bytes) -> Dict[str, Any]:
+    """Turn a raw TouchDesigner reply into a success/result/error dict."""
+    try:
+        with span("decode"):
+            response = decode_json(data)
+        if isinstance(response, dict) and isinstance(response.get("exec_ms"), (int, float)):
+            record_span("td_exec", response["exec_ms"] / 1000)
+        return {"success": response["error"] is None, "result": response["result"], "error": response["error"]}
+    except ValueError:
+        # If we can't parse JSON, return the raw response
+        return {"success": True, "result": data.decode('utf-8').strip(), "error": None}
+
+async def _run_on_stream(stream: TDStream, command: str, timeout: float) -> tuple:
+    """Run one command on a borrowed stream; returns (reply, stream still usable)."""
+    data, healthy = await asyncio.wait_for(_exchange(stream, command), timeout=timeout)
+    return parse_reply(data), healthy
+
+async def _with_stream(operation, timeout: float) -> Dict[str, Any]:
+    """Borrow a stream from the pool, run `operation(stream)` and give the stream back."""
+    pool = connection["pool"]
+    if not connection["connected"] or not pool:
+        return {"success": False, "result": None, "error": "Not connected to TouchDesigner"}
+    
+    try:
+        with span("connector_wait"):
+            stream = await pool.acquire()
+        healthy = False
         try:
-            response = json.loads(response_str)
-            return {"success": response["error"] is None, "result": response["result"], "error": response["error"]}
-        except json.JSONDecodeError:
-            # If we can't parse JSON, return the raw response
-            return {"success": True, "result": response_str, "error": None}
+            reply, healthy = await operation(stream)
+        finally:
+            # A timed out or cancelled connection may still receive the late
+            # reply, so it is never reused
+            pool.release(stream, healthy=healthy)
+        return reply
+    except asyncio.TimeoutError:
+        return {"success": False, "result": None, "error": f"Timed out after {timeout}s waiting for TouchDesigner"}
     except Exception as e:
         return {"success": False, "result": None, "error": str(e)}
 
+def cache_written_values(entries: List[list], replies: Any) -> Optional[List[Optional[str]]]:
+    """Cache the values TouchDesigner stored for a set_parameters batch.
+
+    Returns one status per entry (None when applied, the error message otherwise),
+    or None when the reply does not match the entries.
+    """
+    if not isinstance(replies, list) or len(replies) != len(entries):
+        for entry in entries:
+            param_cache.invalidate(entry[0], entry[1])
+        return None
+    statuses = []
+    for entry, reply in zip(entries, replies):
+        if isinstance(reply, dict) and "value" in reply:
+            # The value read back after the write, as coerced by TouchDesigner
+            param_cache.put(entry[0], entry[1], reply["value"], constant=reply.get("constant", True))
+            statuses.append(None)
+        else:
+            param_cache.invalidate(entry[0], entry[1])
+            statuses.append(reply.get("error") if isinstance(reply, dict) else str(reply))
+    return statuses
+
+async def flush_coalesced_writes(entries: List[list]) -> Dict[str, Any]:
+    """Apply a batch of coalesced parameter writes and cache the values TouchDesigner stored."""
+    command_result = await call_procedure("set_parameters", entries=entries)
+    replies = command_result["result"] if command_result["success"] else None
+    statuses = cache_written_values(entries, replies)
+    if command_result["success"]:
+        command_result["result"] = statuses if statuses is not None else replies
+    return command_result
+
+# Operator tree mirrored from TouchDesigner for list_operators
+operator_index = OperatorIndex(max_age=float(os.environ.get("TD_OPERATOR_INDEX_MAX_AGE", 1.0)))
+operator_index_lock = asyncio.Lock()
+
+# Path/name search over the same tree for find_operators, rebuilt when the index changes
+path_search = PathSearchIndex()
+
+async def refresh_operator_index(force: bool = False) -> Optional[str]:
+    """Bring the operator index up to date; returns an error message on failure."""
+    async with operator_index_lock:
+        if not force and not operator_index.needs_refresh():
+            return None
+        command_result = await call_procedure("operator_tree", root_path="/", client=operator_index.client_id,
+                                              generation=operator_index.generation)
+        reply = command_result["result"]
+        if not command_result["success"] or not isinstance(reply, dict) or "changed" not in reply:
+            return command_result["error"] or f"Unexpected reply from TouchDesigner: {reply}"
+        operator_index.apply(reply["changed"], generation=reply["generation"])
+        if path_search.version != operator_index.version:
+            path_search.rebuild(operator_index.nodes.values(), version=operator_index.version)
+        return None
+
+def mirror_created_operator(node: Dict[str, Any]) -> None:
+    """Add an operator created by this server to both indexes, without a refresh."""
+    in_sync = path_search.version == operator_index.version
+    operator_index.add(node)
+    path_search.add(node)
+    if in_sync:
+        path_search.version = operator_index.version
+
+def mirror_deleted_operator(op_path: str) -> None:
+    """Remove an operator deleted by this server from both indexes, without a refresh."""
+    in_sync = path_search.version == operator_index.version
+    operator_index.remove(op_path)
+    path_search.remove(op_path)
+    if in_sync:
+        path_search.version = operator_index.version
+
+# Opt-in latest-wins coalescing of set_parameter calls
+write_coalescer = WriteCoalescer(flush_coalesced_writes,
+                                 window=float(os.environ.get("TD_COALESCE_WINDOW_MS", 16)) / 1000)
+write_coalescer.enabled = os.environ.get("TD_COALESCE_WRITES", "0") == "1"
+
+async def send_python_command(command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT) -> Dict[str, Any]:
+    """Send a Python command to TouchDesigner and get the result."""
+    return await _with_stream(lambda stream: _run_on_stream(stream, command, timeout), timeout)
+
+async def call_procedure(name: str, timeout: float = DEFAULT_COMMAND_TIMEOUT, **args: Any) -> Dict[str, Any]:
+    """Invoke a registered TouchDesigner procedure by id, installing it on first use."""
+    async def operation(stream: TDStream) -> tuple:
+        if name in stream.procedures:
+            reply, healthy = await _run_on_stream(stream, invoke_expression(name, args), timeout)
+            if not healthy or reply["result"] != MISSING:
+                return reply, healthy
+            # TouchDesigner lost its registry (e.g. restarted): install again
+            stream.procedures.discard(name)
+        reply, healthy = await _run_on_stream(stream, install_expression(name), timeout)
+        if not reply["success"] or not healthy:
+            return reply, healthy
+        stream.procedures.add(name)
+        return await _run_on_stream(stream, invoke_expression(name, args), timeout)
+    return await _with_stream(operation, timeout)
+
 @mcp.tool()
+@traced
 async def launch_touchdesigner(path: Optional[str] = None, project: Optional[str] = None) -> Dict[str, Any]:
     """Launch TouchDesigner application.
     
@@ -123,11 +369,15 @@ async def launch_touchdesigner(path: Optional[str] = None, project: Optional[str
         # Launch TouchDesigner
         connection["td_process"] = subprocess.Popen(cmd)
         
-        # Give it time to start up
-        time.sleep(5)
+        # Give it time to start up, polling until the Python port accepts connections
+        deadline = time.monotonic() + DEFAULT_LAUNCH_TIMEOUT
+        connected = await connect_to_touchdesigner()
+        while not connected and time.monotonic() < deadline and connection["td_process"].poll() is None:
+            await asyncio.sleep(0.5)
+            connected = await connect_to_touchdesigner()
         
         # Try to connect
-        if connect_to_touchdesigner():
+        if connected:
             result["success"] = True
             result["message"] = "TouchDesigner launched successfully and connected via Python port."
         else:
@@ -139,6 +389,7 @@ async def launch_touchdesigner(path: Optional[str] = None, project: Optional[str
         return result
 
 @mcp.tool()
+@traced
 async def connect(host: str = "localhost", port: int = DEFAULT_PORT) -> Dict[str, Any]:
     """Connect to a running TouchDesigner instance.
     
@@ -150,10 +401,10 @@ async def connect(host: str = "localhost", port: int = DEFAULT_PORT) -> Dict[str
     
     # Disconnect if already connected
     if connection["connected"]:
-        disconnect_from_touchdesigner()
+        await disconnect_from_touchdesigner()
     
     # Try to connect
-    if connect_to_touchdesigner(host, port):
+    if await connect_to_touchdesigner(host, port):
         result["success"] = True
         result["message"] = f"Successfully connected to TouchDesigner at {host}:{port}"
     else:
@@ -162,12 +413,13 @@ async def connect(host: str = "localhost", port: int = DEFAULT_PORT) -> Dict[str
     return result
 
 @mcp.tool()
+@traced
 async def disconnect() -> Dict[str, Any]:
     """Disconnect from TouchDesigner."""
     result = {"success": False, "message": ""}
     
     if connection["connected"]:
-        disconnect_from_touchdesigner()
+        await disconnect_from_touchdesigner()
         result["success"] = True
         result["message"] = "Successfully disconnected from TouchDesigner"
     else:
@@ -176,20 +428,21 @@ async def disconnect() -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def close_touchdesigner() -> Dict[str, Any]:
     """Close the TouchDesigner application."""
     result = {"success": False, "message": ""}
     
     if connection["connected"]:
         # Try to close gracefully first
-        command_result = send_python_command("op.quit()")
-        disconnect_from_touchdesigner()
+        command_result = await send_python_command("op.quit()", timeout=5)
+        await disconnect_from_touchdesigner()
         
         # If process was launched by us, make sure it's terminated
         if connection["td_process"]:
             try:
                 connection["td_process"].terminate()
-                connection["td_process"].wait(timeout=5)
+                await asyncio.to_thread(connection["td_process"].wait, timeout=5)
             except:
                 try:
                     connection["td_process"].kill()
@@ -205,9 +458,13 @@ async def close_touchdesigner() -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def execute_python(code: str) -> Dict[str, Any]:
     """Execute arbitrary Python code in TouchDesigner.
     
+    The parameter cache is cleared and the operator index refreshed on next use,
+    since the code may change anything in the project.
+    
     Args:
         code: Python code to execute
     """
@@ -217,7 +474,10 @@ async def execute_python(code: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command_result = send_python_command(code)
+    param_cache.clear()
+    # Arbitrary code: the operator tree cannot be mirrored locally
+    operator_index.mark_dirty()
+    command_result = await send_python_command(code)
     result["success"] = command_result["success"]
     result["result"] = command_result["result"]
     
@@ -229,6 +489,7 @@ async def execute_python(code: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
     """Save the current TouchDesigner project.
     
@@ -247,7 +508,7 @@ async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
         else:
             command = 'op.project.save()'
         
-        command_result = send_python_command(command)
+        command_result = await send_python_command(command)
         result["success"] = command_result["success"]
         
         if result["success"]:
@@ -263,6 +524,7 @@ async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
         return result
 
 @mcp.tool()
+@traced
 async def create_operator(op_type: str, parent_path: str, name: str) -> Dict[str, Any]:
     """Create a new operator in TouchDesigner.
     
@@ -278,18 +540,25 @@ async def create_operator(op_type: str, parent_path: str, name: str) -> Dict[str
         return result
     
     command = f'op("{parent_path}").create({op_type}, "{name}")'
-    command_result = send_python_command(command)
+    command_result = await send_python_command(command)
     
     if command_result["success"]:
+        operator_path = f"{parent_path.rstrip('/')}/{name}"
+        op_kind, family = split_operator_type(op_type)
+        mirror_created_operator({"name": name, "path": operator_path, "type": op_kind, "family": family,
+                                 "parent": parent_path.rstrip("/") or "/", "isCOMP": family == "COMP"})
         result["success"] = True
         result["message"] = f"Operator {name} created successfully"
         result["operator_path"] = f"{parent_path}/{name}"
     else:
+        # The command may still have run (e.g. timed out): resynchronize on next lookup
+        operator_index.mark_dirty()
         result["message"] = f"Failed to create operator: {command_result['error']}"
     
     return result
 
 @mcp.tool()
+@traced
 async def delete_operator(op_path: str) -> Dict[str, Any]:
     """Delete an operator in TouchDesigner.
     
@@ -302,25 +571,30 @@ async def delete_operator(op_path: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f'op("{op_path}").destroy()'
-    command_result = send_python_command(command)
+    command_result = await call_procedure("delete_operator", op_path=op_path)
+    param_cache.invalidate(op_path)
     
     if command_result["success"]:
+        mirror_deleted_operator(op_path)
         result["success"] = True
         result["message"] = f"Operator {op_path} deleted successfully"
     else:
+        operator_index.mark_dirty()
         result["message"] = f"Failed to delete operator: {command_result['error']}"
     
     return result
 
 @mcp.tool()
-async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, Any]:
+@traced
+async def set_parameter(op_path: str, parameter: str, value: Any, coalesce: Optional[bool] = None) -> Dict[str, Any]:
     """Set a parameter value on an operator.
     
     Args:
         op_path: Path to the operator
         parameter: Parameter name
         value: New parameter value
+        coalesce: Merge this write with other writes to the same parameter within the
+            coalescing window, keeping only the latest value (default: server setting)
     """
     result = {"success": False, "message": ""}
     
@@ -328,16 +602,28 @@ async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, A
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    # Convert value to proper format based on type
-    if isinstance(value, str):
-        formatted_value = f'"{value}"'
-    elif isinstance(value, (list, tuple)):
-        formatted_value = str(value)
-    else:
-        formatted_value = str(value)
+    if coalesce if coalesce is not None else write_coalescer.enabled:
+        # Invalidated now, written through when the batch is flushed
+        param_cache.invalidate(op_path, parameter)
+        outcome = await write_coalescer.submit(op_path, parameter, value)
+        result.update(outcome)
+        del result["error"]
+        if outcome["superseded"]:
+            result["message"] = f"Parameter {parameter} on {op_path} superseded by a newer value"
+        elif outcome["success"]:
+            result["message"] = f"Parameter {parameter} set successfully on {op_path}"
+        else:
+            result["message"] = f"Failed to set parameter: {outcome['error']}"
+        return result
+    
+    command_result = await call_procedure("set_parameter", op_path=op_path, parameter=parameter, value=value)
     
-    command = f'op("{op_path}").par.{parameter} = {formatted_value}'
-    command_result = send_python_command(command)
+    reply = command_result["result"]
+    if command_result["success"] and isinstance(reply, dict) and "value" in reply:
+        # The value read back after the write, as coerced by TouchDesigner
+        param_cache.put(op_path, parameter, reply["value"], constant=reply.get("constant", True))
+    else:
+        param_cache.invalidate(op_path, parameter)
     
     if command_result["success"]:
         result["success"] = True
@@ -348,12 +634,79 @@ async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, A
     return result
 
 @mcp.tool()
-async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
+@traced
+async def configure_write_coalescing(enabled: Optional[bool] = None, window_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Configure latest-wins coalescing of set_parameter calls and get its counters.
+    
+    When enabled, writes to the same parameter within the window are merged and only
+    the latest value is sent; all pending writes are flushed as one batch.
+    
+    Args:
+        enabled: Coalesce set_parameter calls by default (optional, unchanged if omitted)
+        window_ms: Buffering window in milliseconds (optional, unchanged if omitted)
+    """
+    if enabled is not None:
+        write_coalescer.enabled = enabled
+    if window_ms is not None:
+        if window_ms < 0:
+            return {"success": False, "message": "window_ms must be positive", "stats": write_coalescer.stats()}
+        write_coalescer.window = window_ms / 1000
+    return {"success": True, "message": "Write coalescing updated", "stats": write_coalescer.stats()}
+
+@mcp.tool()
+@traced
+async def set_parameters(parameters: Union[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Set many parameter values in a single TouchDesigner script execution.
+    
+    All writes are applied in the same frame, so the operators cook once.
+    
+    Args:
+        parameters: Either a list of {"op_path", "parameter", "value"} entries
+            or a nested {op_path: {parameter: value}} map
+    """
+    result = {"success": False, "message": "", "applied": 0, "failed": 0, "errors": []}
+    
+    if not connection["connected"]:
+        result["message"] = "Not connected to TouchDesigner"
+        return result
+    
+    try:
+        entries = normalize_parameter_writes(parameters)
+    except (KeyError, TypeError, AttributeError) as e:
+        result["message"] = f"Invalid parameters: expected a list of {{op_path, parameter, value}} or a {{op_path: {{parameter: value}}}} map ({e})"
+        return result
+    
+    command_result = await call_procedure("set_parameters", entries=entries)
+    statuses = cache_written_values(entries, command_result["result"] if command_result["success"] else None)
+    
+    if not command_result["success"]:
+        result["message"] = f"Failed to set parameters: {command_result['error']}"
+        return result
+    
+    # One status per entry: None when applied, the error message otherwise
+    if statuses is None:
+        result["message"] = f"Unexpected reply from TouchDesigner: {command_result['result']}"
+        return result
+    for index, (entry, error) in enumerate(zip(entries, statuses)):
+        if error is None:
+            result["applied"] += 1
+        else:
+            result["errors"].append({"index": index, "op_path": entry[0], "parameter": entry[1], "error": error})
+    result["failed"] = len(result["errors"])
+    result["success"] = result["failed"] == 0
+    result["message"] = f"Set {result['applied']} of {len(entries)} parameters"
+    
+    return result
+
+@mcp.tool()
+@traced
+async def get_parameter(op_path: str, parameter: str, use_cache: bool = True) -> Dict[str, Any]:
     """Get a parameter value from an operator.
     
     Args:
         op_path: Path to the operator
         parameter: Parameter name
+        use_cache: Serve the value from the client-side cache when possible (default: True)
     """
     result = {"success": False, "message": "", "value": None}
     
@@ -361,12 +714,22 @@ async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f'op("{op_path}").par.{parameter}.eval()'
-    command_result = send_python_command(command)
+    if use_cache:
+        hit, value = param_cache.get(op_path, parameter)
+        if hit:
+            result["success"] = True
+            result["value"] = value
+            result["cached"] = True
+            result["message"] = f"Parameter {parameter} retrieved from cache for {op_path}"
+            return result
+    
+    command_result = await call_procedure("get_parameter", op_path=op_path, parameter=parameter)
     
     if command_result["success"]:
+        reply = command_result["result"]
+        param_cache.put(op_path, parameter, reply["value"], constant=reply["constant"])
         result["success"] = True
-        result["value"] = command_result["result"]
+        result["value"] = reply["value"]
         result["message"] = f"Parameter {parameter} retrieved successfully from {op_path}"
     else:
         result["message"] = f"Failed to get parameter: {command_result['error']}"
@@ -374,11 +737,101 @@ async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
-async def list_operators(parent_path: str = "/") -> Dict[str, Any]:
-    """List all operators under a specified path.
+@traced
+async def invalidate_parameter_cache(op_path: Optional[str] = None, parameter: Optional[str] = None) -> Dict[str, Any]:
+    """Evict cached parameter values.
+    
+    Args:
+        op_path: Operator whose parameters (and children's) are evicted (optional, default: everything)
+        parameter: Single parameter of op_path to evict (optional)
+    """
+    evicted = param_cache.invalidate(op_path, parameter)
+    return {"success": True, "message": f"Evicted {evicted} cached parameter values", "evicted": evicted}
+
+@mcp.tool()
+@traced
+async def parameter_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters and size of the parameter value cache."""
+    return {"success": True, "stats": param_cache.stats()}
+
+@mcp.tool()
+@traced
+async def list_operators(parent_path: str = "/", depth: Optional[int] = 1, refresh: bool = False,
+                         limit: Optional[int] = None, cursor: Optional[str] = None,
+                         fields: Optional[Union[str, List[str]]] = None,
+                         family: Optional[str] = None, op_type: Optional[str] = None) -> Dict[str, Any]:
+    """List operators under a specified path.
+    
+    Served from an in-memory index of the operator tree, refreshed incrementally
+    from TouchDesigner when it is older than a second or after a change.
     
     Args:
         parent_path: Path to the parent operator (default: root)
+        depth: Number of levels to descend; 0 lists every descendant (default: 1)
+        refresh: Force an index refresh before listing (default: False)
+        limit: Maximum number of operators per page (optional, default: all)
+        cursor: next_cursor returned by the previous page (optional)
+        fields: Fields to return, e.g. "path,type" (optional, default: all)
+        family: Only operators of this family, e.g. "TOP" (optional)
+        op_type: Only operators of this type, e.g. "noise" or "noiseTOP" (optional)
+    """
+    result = {"success": False, "message": "", "operators": [], "next_cursor": None, "total": 0}
+    
+    if not connection["connected"]:
+        result["message"] = "Not connected to TouchDesigner"
+        return result
+    
+    if limit is not None and limit <= 0:
+        result["message"] = "limit must be a positive integer"
+        return result
+    
+    error = await refresh_operator_index(force=refresh)
+    if error is not None:
+        result["message"] = f"Failed to list operators: {error}"
+        return result
+    
+    parent_path = parent_path.rstrip("/") or "/"
+    if parent_path != "/" and not operator_index.contains(parent_path):
+        result["message"] = f"Failed to list operators: Operator not found: {parent_path}"
+        return result
+    
+    # TouchDesigner's type is "noise": accept the class name "noiseTOP" as well
+    op_type, family = normalize_type_filter(op_type, family)
+    filters = {"family": family, "type": op_type}
+    query = {"parent_path": parent_path, "depth": depth or None, "filters": filters}
+    nodes = (dict(node, valid=True) for node in operator_index.iter(parent_path, depth=depth or None))
+    try:
+        operators, next_cursor, total = paginate(nodes, query, limit=limit, cursor=cursor,
+                                                 fields=parse_fields(fields), filters=filters)
+    except ValueError as e:
+        result["message"] = f"Failed to list operators: {e}"
+        return result
+    
+    result["success"] = True
+    result["operators"] = operators
+    result["next_cursor"] = next_cursor
+    result["total"] = total
+    result["message"] = f"Listed {len(operators)} of {total} operators under {parent_path}"
+    
+    return result
+
+@mcp.tool()
+@traced
+async def find_operators(query: str, mode: str = "auto", limit: int = 20, refresh: bool = False,
+                         fields: Optional[Union[str, List[str]]] = None) -> Dict[str, Any]:
+    """Find operators by path prefix, glob pattern or approximate name.
+    
+    Searches an in-memory index built from one dump of the network and kept
+    current by create_operator and delete_operator, so lookups do not wait on
+    TouchDesigner. Edits the index cannot follow (execute_python, ...) mark it
+    stale and the next search refreshes it first.
+    
+    Args:
+        query: Path prefix ("/project1/geo"), name prefix, glob ("*noise*", "/project1/*/out?") or approximate name
+        mode: "prefix", "glob", "fuzzy" or "auto" (glob if query has wildcards, else prefix then fuzzy)
+        limit: Maximum number of matches (default: 20)
+        refresh: Refresh the index from TouchDesigner before searching (default: False)
+        fields: Fields to return, e.g. "path,type" (optional, default: all)
     """
     result = {"success": False, "message": "", "operators": []}
     
@@ -386,25 +839,35 @@ async def list_operators(parent_path: str = "/") -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f"""
-[{{"name": child.name, 
-   "path": child.path,
-   "type": child.type,
-   "valid": child.valid}} 
- for child in op("{parent_path}").findChildren(depth=1)]
-"""
-    command_result = send_python_command(command)
+    if mode not in ("auto", "prefix", "glob", "fuzzy"):
+        result["message"] = f"Unknown search mode: {mode}"
+        return result
     
-    if command_result["success"]:
-        result["success"] = True
-        result["operators"] = command_result["result"]
-        result["message"] = f"Listed {len(command_result['result'])} operators under {parent_path}"
-    else:
-        result["message"] = f"Failed to list operators: {command_result['error']}"
+    if limit <= 0:
+        result["message"] = "limit must be a positive integer"
+        return result
+    
+    if refresh or operator_index.dirty or path_search.version is None:
+        error = await refresh_operator_index(force=refresh)
+        if error is not None:
+            result["message"] = f"Failed to find operators: {error}"
+            return result
+        if path_search.version is None:
+            path_search.rebuild(operator_index.nodes.values(), version=operator_index.version)
+    
+    matches = path_search.search(query, mode=mode, limit=limit)
+    selected = parse_fields(fields)
+    if selected:
+        matches = [{f: match.get(f) for f in selected} for match in matches]
+    
+    result["success"] = True
+    result["operators"] = matches
+    result["message"] = f"Found {len(matches)} operators matching {query}"
     
     return result
 
 @mcp.tool()
+@traced
 async def cook_operator(op_path: str) -> Dict[str, Any]:
     """Force an operator to cook (update).
     
@@ -417,8 +880,7 @@ async def cook_operator(op_path: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f'op("{op_path}").cook(force=True)'
-    command_result = send_python_command(command)
+    command_result = await call_procedure("cook_operator", op_path=op_path)
     
     if command_result["success"]:
         result["success"] = True
@@ -429,11 +891,22 @@ async def cook_operator(op_path: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
-async def get_operator_info(op_path: str) -> Dict[str, Any]:
+@traced
+async def get_operator_info(op_path: str, parameters: Optional[List[str]] = None,
+                            param_offset: int = 0, param_limit: Optional[int] = None,
+                            include_labels: bool = True, include_children: bool = True,
+                            non_default_only: bool = False, summary: bool = False) -> Dict[str, Any]:
     """Get detailed information about an operator.
     
     Args:
         op_path: Path to the operator
+        parameters: Names or patterns of the parameters to return, e.g. ["t?", "scale"] (optional, default: all)
+        param_offset: Index of the first parameter to return, for paging (default: 0)
+        param_limit: Maximum number of parameters to return (optional, default: all)
+        include_labels: Include label, style and mode of each parameter (default: True)
+        include_children: Include the names of the operator's children (default: True)
+        non_default_only: Only return parameters whose value differs from their default (default: False)
+        summary: Only return identity, cook state and parameter/children counts, without evaluating parameters (default: False)
     """
     result = {"success": False, "message": "", "info": {}}
     
@@ -441,30 +914,14 @@ async def get_operator_info(op_path: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f"""
-operator = op("{op_path}")
-if operator.valid:
-    {{
-        "name": operator.name,
-        "path": operator.path,
-        "type": operator.type,
-        "valid": operator.valid,
-        "cooking": operator.cooking,
-        "cookTime": operator.cookTime,
-        "parameters": [{{
-            "name": p.name,
-            "value": p.eval(),
-            "label": p.label,
-            "style": p.style,
-            "mode": p.mode
-        }} for p in operator.pars],
-        "numChildren": len(operator.children),
-        "childrenNames": [c.name for c in operator.children]
-    }}
-else:
-    None
-"""
-    command_result = send_python_command(command)
+    if param_offset < 0 or (param_limit is not None and param_limit <= 0):
+        result["message"] = "param_offset must be >= 0 and param_limit > 0"
+        return result
+    
+    command_result = await call_procedure("get_operator_info", op_path=op_path, parameters=parameters,
+                                          param_offset=param_offset, param_limit=param_limit,
+                                          include_labels=include_labels, include_children=include_children,
+                                          non_default_only=non_default_only, summary=summary)
     
     if command_result["success"] and command_result["result"] is not None:
         result["success"] = True
@@ -476,6 +933,7 @@ else:
     return result
 
 @mcp.tool()
+@traced
 async def export_movie(comp_path: str, output_path: str, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Export a movie from a TouchDesigner component.
     
@@ -522,7 +980,7 @@ if movie.valid:
 else:
     "Invalid component path"
 """
-    command_result = send_python_command(command)
+    command_result = await send_python_command(command)
     
     if command_result["success"] and command_result["result"] == "Success":
         result["success"] = True
@@ -533,13 +991,25 @@ else:
     return result
 
 @mcp.tool()
-async def take_screenshot(output_path: str, width: int = 1920, height: int = 1080) -> Dict[str, Any]:
-    """Take a screenshot of the current TouchDesigner window.
+@traced
+async def take_screenshot(output_path: Optional[str] = None, width: int = 1920, height: int = 1080,
+                          operator_path: Optional[str] = None, image_format: str = "jpeg",
+                          quality: int = 85, max_size: int = 512,
+                          crop: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Take a screenshot of the current TouchDesigner network view or of a TOP.
+    
+    Without output_path, the same capture is cropped, downscaled and encoded inside
+    TouchDesigner and returned base64-encoded in "image" instead of being saved.
     
     Args:
-        output_path: Output file path
-        width: Screenshot width (default: 1920)
-        height: Screenshot height (default: 1080)
+        output_path: Output file path (omit to get the image back in memory)
+        width: Width of the network view capture (default: 1920)
+        height: Height of the network view capture (default: 1080)
+        operator_path: TOP to capture instead of the network view
+        image_format: "jpeg" or "png", in memory (default: jpeg)
+        quality: JPEG quality from 1 to 100, in memory (default: 85)
+        max_size: Longest side of the returned image in pixels, never upscaled (default: 512)
+        crop: Region to keep, as {"x", "y", "width", "height"} fractions of the image from its top left corner
     """
     result = {"success": False, "message": ""}
     
@@ -547,14 +1017,25 @@ async def take_screenshot(output_path: str, width: int = 1920, height: int = 108
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f"""
-try:
-    ui.viewportImage(asImage=True).save("{output_path}", width={width}, height={height})
-    "Success"
-except Exception as e:
-    str(e)
-"""
-    command_result = send_python_command(command)
+    if output_path is None:
+        error = check_image_options(image_format, quality, max_size, crop)
+        if error:
+            result["message"] = error
+            return result
+        command_result = await call_procedure("encode_image", operator_path=operator_path,
+                                              width=width, height=height, image_format=image_format,
+                                              quality=quality, max_size=max_size, crop=crop)
+        if command_result["success"] and isinstance(command_result["result"], dict):
+            image = command_result["result"]
+            result["success"] = True
+            result["image"] = image
+            result["message"] = f"Captured a {image['width']}x{image['height']} {image_format} image ({image['bytes']} bytes)"
+        else:
+            result["message"] = f"Failed to take screenshot: {command_result['error'] or command_result['result']}"
+        return result
+    
+    command = save_screenshot_command(output_path, width, height, operator_path)
+    command_result = await send_python_command(command)
     
     if command_result["success"] and command_result["result"] == "Success":
         result["success"] = True
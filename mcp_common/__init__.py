@@ -0,0 +1 @@
+"""Modules shared by the MCP servers (server, mcp-server and touchdesigner-mcp-server)."""
@@ -0,0 +1,71 @@
+"""Cursor pagination, filtering and field projection for operator listings.
+
+Shared by the Flask server (get_project_info) and the FastMCP servers.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import base64
+import hashlib
+import json
+
+def parse_fields(fields: Union[str, List[str], None]) -> Optional[List[str]]:
+    """Accept "path,type" or ["path", "type"]; None keeps every field."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    fields = [f.strip() for f in fields if f and f.strip()]
+    return fields or None
+
+def _fingerprint(query: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(query, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+def encode_cursor(offset: int, query: Dict[str, Any]) -> str:
+    """Opaque cursor for the next page of a query."""
+    token = json.dumps({"o": offset, "q": _fingerprint(query)}).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: Optional[str], query: Dict[str, Any]) -> int:
+    """Offset encoded in a cursor; raises ValueError if it belongs to another query."""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset, fingerprint = int(token["o"]), token["q"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if fingerprint != _fingerprint(query) or offset < 0:
+        raise ValueError("Cursor does not match this query")
+    return offset
+
+def paginate(items: Iterable[Dict[str, Any]], query: Dict[str, Any], limit: Optional[int] = None,
+             cursor: Optional[str] = None, fields: Optional[List[str]] = None,
+             filters: Optional[Dict[str, Optional[str]]] = None) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+    """Return (page, next_cursor, total matching) without materializing the whole listing."""
+    offset = decode_cursor(cursor, query)
+    wanted = {k: str(v).lower() for k, v in (filters or {}).items() if v}
+    page: List[Dict[str, Any]] = []
+    total = 0
+    for item in items:
+        if wanted and any(str(item.get(k, "")).lower() != v for k, v in wanted.items()):
+            continue
+        if total >= offset and (limit is None or len(page) < limit):
+            page.append({f: item.get(f) for f in fields} if fields else item)
+        total += 1
+    end = offset + len(page)
+    next_cursor = encode_cursor(end, query) if end < total else None
+    return page, next_cursor, total
+
+def split_operator_type(op_type: str) -> Tuple[str, str]:
+    """Split an operator class name into (type, family), e.g. "noiseTOP" -> ("noise", "TOP")."""
+    class_name = op_type.split(".")[-1]
+    op_kind = class_name.rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    return op_kind, class_name[len(op_kind):]
+
+def normalize_type_filter(op_type: Optional[str], family: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Type and family filters matching TouchDesigner's, which reports "noiseTOP" as type "noise"."""
+    if op_type:
+        op_kind, op_family = split_operator_type(op_type)
+        if op_kind and op_family:
+            return op_kind, family or op_family
+    return op_type, family
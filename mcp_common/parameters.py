@@ -0,0 +1,10 @@
+"""Parameter helpers shared by the FastMCP servers."""
+from typing import Any, Dict, List, Union
+
+def normalize_parameter_writes(parameters: Union[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]) -> List[list]:
+    """Flatten set_parameters input into [op_path, parameter, value] entries."""
+    if isinstance(parameters, dict):
+        return [[op_path, name, value]
+                for op_path, values in parameters.items()
+                for name, value in values.items()]
+    return [[entry["op_path"], entry["parameter"], entry["value"]] for entry in parameters]
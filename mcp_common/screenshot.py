@@ -0,0 +1,113 @@
+"""Screenshot capture shared by the FastMCP servers.
+
+Both modes capture the same image: the TOP at operator_path, or the network
+viewport when it is omitted. The file mode saves it as is; the in-memory mode
+crops, downscales and encodes it inside TouchDesigner, through a helper network
+built once, and returns it base64-encoded without touching the disk.
+"""
+from typing import Any, Dict, Optional
+
+IMAGE_FORMATS = ("jpeg", "png")
+
+# Helper network of the in-memory capture, outside the user's project and hidden
+# from the operator index
+CAPTURE_NETWORK_PATH = "/local/mcp_capture"
+
+# TouchDesigner-side source of the in-memory capture. It defines __mcp_proc so that
+# mcp-server can register it as a procedure; see encode_image_command() otherwise.
+ENCODE_IMAGE_PROCEDURE = '''
+def __mcp_proc(operator_path=None, width=1920, height=1080, image_format="jpeg", quality=85,
+               max_size=512, crop=None):
+    import base64
+    helper = op("%(path)s")
+    if helper is None or not all(helper.op(name) for name in ("viewport", "select", "crop", "fit")):
+        # Built once (viewport -> select -> crop -> fit) and reused by every capture
+        if helper is not None:
+            helper.destroy()
+        helper = op("%(parent)s").create(baseCOMP, "%(name)s")
+        helper.expose = False
+        helper.create(scriptTOP, "viewport")
+        select = helper.create(selectTOP, "select")
+        cropper = helper.create(cropTOP, "crop")
+        fit = helper.create(fitTOP, "fit")
+        cropper.inputConnectors[0].connect(select)
+        fit.inputConnectors[0].connect(cropper)
+        fit.par.outputresolution = "custom"
+        fit.par.fit = "fill"
+    viewport, select, cropper, fit = (helper.op(name) for name in ("viewport", "select", "crop", "fit"))
+    if operator_path:
+        source = op(operator_path)
+        if source is None or not source.isTOP:
+            raise ValueError(f"Not a TOP: {operator_path}")
+        source_w, source_h = source.width, source.height
+    else:
+        # Same capture as the file mode, copied into the helper in memory
+        viewport.copyNumpyArray(ui.viewportImage(asImage=True).numpyArray())
+        source, source_w, source_h = viewport, width, height
+    select.par.top = source.path
+    # crop: normalized region, origin at the top left corner
+    x, y, w, h = (crop["x"], crop["y"], crop["width"], crop["height"]) if crop else (0.0, 0.0, 1.0, 1.0)
+    cropper.par.cropleft = x
+    cropper.par.cropright = x + w
+    cropper.par.cropbottom = 1.0 - (y + h)
+    cropper.par.croptop = 1.0 - y
+    crop_w, crop_h = source_w * w, source_h * h
+    scale = min(1.0, max_size / max(crop_w, crop_h, 1))
+    fit.par.resolutionw = max(1, round(crop_w * scale))
+    fit.par.resolutionh = max(1, round(crop_h * scale))
+    # The helper only cooks while a capture pulls it
+    helper.allowCooking = True
+    try:
+        fit.cook(force=True)
+        if image_format == "png":
+            data = fit.saveByteArray(".png")
+        else:
+            data = fit.saveByteArray(".jpg", quality=quality / 100)
+    finally:
+        helper.allowCooking = False
+    return {
+        "mime_type": "image/png" if image_format == "png" else "image/jpeg",
+        "width": fit.width,
+        "height": fit.height,
+        "bytes": len(data),
+        "data": base64.b64encode(bytes(data)).decode("ascii"),
+    }
+''' % {"path": CAPTURE_NETWORK_PATH, "parent": CAPTURE_NETWORK_PATH.rsplit("/", 1)[0],
+       "name": CAPTURE_NETWORK_PATH.rsplit("/", 1)[1]}
+
+def check_image_options(image_format: str, quality: int, max_size: int,
+                        crop: Optional[Dict[str, float]]) -> Optional[str]:
+    """Error message for invalid in-memory screenshot options, None if they are valid."""
+    if image_format not in IMAGE_FORMATS:
+        return f"image_format must be one of {', '.join(IMAGE_FORMATS)}"
+    if not 1 <= quality <= 100:
+        return "quality must be between 1 and 100"
+    if max_size < 16:
+        return "max_size must be at least 16 pixels"
+    if crop is not None:
+        try:
+            x, y, w, h = (float(crop[key]) for key in ("x", "y", "width", "height"))
+        except (KeyError, TypeError, ValueError):
+            return "crop must have numeric x, y, width and height"
+        if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > 1 or y + h > 1:
+            return "crop must be a non-empty region within 0..1 (origin at the top left corner)"
+    return None
+
+def encode_image_command(args: Dict[str, Any]) -> str:
+    """Standalone script that defines the in-memory capture and evaluates to its result."""
+    return f"{ENCODE_IMAGE_PROCEDURE}\n__mcp_proc(**{args!r})"
+
+def save_screenshot_command(output_path: str, width: int, height: int,
+                            operator_path: Optional[str] = None) -> str:
+    """Script that saves the capture to output_path and evaluates to "Success" or the error."""
+    if operator_path:
+        capture = f"op({operator_path!r}).save({output_path!r})"
+    else:
+        capture = f"ui.viewportImage(asImage=True).save({output_path!r}, width={width}, height={height})"
+    return f"""
+try:
+    {capture}
+    "Success"
+except Exception as e:
+    str(e)
+"""
@@ -0,0 +1,174 @@
+"""Per-call tracing: trace ids, timed spans and sampled profiles of slow calls.
+
+Shared by the Flask server (HTTP requests and JSON-RPC calls) and the FastMCP
+servers (tool calls). cProfile records a whole thread, so at most one trace per
+thread is profiled at a time; on an event loop, a profile also covers the other
+tasks that ran while the traced call was awaiting.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("td_mcp.trace")
+
+# Calls slower than this are logged at WARNING with their spans
+SLOW_MS = float(os.environ.get("TD_TRACE_SLOW_MS", 500))
+# Share of calls run under cProfile (0 disables); profiles are only written for slow calls
+PROFILE_RATE = float(os.environ.get("TD_TRACE_PROFILE_RATE", 0))
+PROFILE_DIR = os.environ.get("TD_TRACE_PROFILE_DIR", "profiles")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("td_mcp_trace", default=None)
+
+# Threads with a running trace profiler: a second enable() on the same thread
+# would take over from the first trace's profiler
+_profiled_threads: set = set()
+_profiled_lock = threading.Lock()
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+class Trace:
+    """Trace id and timed spans of one tool call, JSON-RPC call or HTTP request."""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id or new_trace_id()
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Tuple[str, float]] = []
+        self.profiler: Optional[cProfile.Profile] = None
+        self._profiled_thread: Optional[int] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def add_span(self, name: str, seconds: float) -> None:
+        self.spans.append((name, seconds))
+
+    def span_totals(self) -> Dict[str, float]:
+        """Total duration per span name, in milliseconds."""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds * 1000
+        return totals
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "spans": {name: round(ms, 3) for name, ms in self.span_totals().items()},
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (shown by browser developer tools)."""
+        parts = [f"{re.sub(r'[^A-Za-z0-9_]', '_', name)};dur={ms:.3f}"
+                 for name, ms in self.span_totals().items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(parts)
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def begin(name: str, trace_id: Optional[str] = None) -> Trace:
+    """Start a trace in the current context; finish it with end()."""
+    trace = Trace(name, trace_id)
+    trace._token = _current.set(trace)
+    if PROFILE_RATE > 0 and random.random() < PROFILE_RATE:
+        _start_profile(trace)
+    return trace
+
+def _start_profile(trace: Trace) -> None:
+    thread = threading.get_ident()
+    with _profiled_lock:
+        if thread in _profiled_threads:
+            # Another trace is being profiled on this thread: leave it alone
+            return
+        _profiled_threads.add(thread)
+    trace.profiler = cProfile.Profile()
+    try:
+        trace.profiler.enable()
+    except ValueError:
+        # Another profiler (not a trace's) is already active on this thread
+        trace.profiler = None
+        with _profiled_lock:
+            _profiled_threads.discard(thread)
+        return
+    trace._profiled_thread = thread
+
+def _stop_profile(trace: Trace) -> None:
+    trace.profiler.disable()
+    with _profiled_lock:
+        _profiled_threads.discard(trace._profiled_thread)
+
+def end(trace: Trace) -> None:
+    """Finish a trace: log its spans and keep the profile if the call was slow."""
+    trace.duration = time.perf_counter() - trace.started
+    if trace.profiler is not None:
+        _stop_profile(trace)
+    if trace._token is not None:
+        _current.reset(trace._token)
+        trace._token = None
+    if trace.duration * 1000 >= SLOW_MS:
+        logger.warning(f"Slow call: {json.dumps(trace.summary())}")
+        if trace.profiler is not None:
+            _dump_profile(trace)
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Trace: {json.dumps(trace.summary())}")
+
+def _dump_profile(trace: Trace) -> None:
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", trace.name)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{trace.trace_id}.prof")
+        trace.profiler.dump_stats(path)
+        logger.warning(f"Profile of slow call {trace.trace_id} written to {path}")
+    except OSError as e:
+        logger.error(f"Cannot write profile of {trace.trace_id}: {e}")
+
+@contextmanager
+def trace(name: str, trace_id: Optional[str] = None):
+    """Trace a block of code as a call of its own."""
+    current = begin(name, trace_id)
+    try:
+        yield current
+    finally:
+        end(current)
+
+@contextmanager
+def span(name: str):
+    """Time a step of the current trace (no-op outside a trace)."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add_span(name, time.perf_counter() - started)
+
+def record_span(name: str, seconds: float) -> None:
+    """Add a step measured elsewhere, e.g. the execution time reported by TouchDesigner."""
+    current = _current.get()
+    if current is not None:
+        current.add_span(name, seconds)
+
+def traced(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run each call of an async tool under its own trace."""
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        trace = begin(fn.__name__)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            end(trace)
+    return wrapper
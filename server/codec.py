@@ -0,0 +1,140 @@
+import sys
+import json
+import array
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+# Type d'extension MessagePack utilisé pour les tableaux numériques
+NUMERIC_ARRAY_EXT = 1
+# En dessous de cette taille, un tableau numérique reste une liste ordinaire
+NUMERIC_ARRAY_MIN_LENGTH = 8
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class CodecError(ValueError):
+    """Un message reçu ne peut pas être décodé"""
+
+
+class JsonCodec:
+    """Codec texte JSON (par défaut), accéléré par orjson s'il est installé"""
+
+    name = "json"
+    binary = False
+
+    def __init__(self):
+        self.backend = "orjson" if orjson is not None else "json"
+
+    def encode(self, obj):
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj)
+            except TypeError:
+                # Clés non textuelles, entiers hors 64 bits... : repli sur json
+                pass
+        return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+    def decode(self, data):
+        try:
+            if orjson is not None:
+                return orjson.loads(data)
+            return json.loads(data)
+        except ValueError as e:
+            raise CodecError(str(e)) from e
+
+
+def _as_numeric_array(values):
+    """Convertir une liste homogène de nombres en array.array, sinon None"""
+    if len(values) < NUMERIC_ARRAY_MIN_LENGTH:
+        return None
+    first = type(values[0])
+    if first is float:
+        if all(type(v) is float for v in values):
+            return array.array('d', values)
+    elif first is int:
+        if all(type(v) is int and _INT64_MIN <= v <= _INT64_MAX for v in values):
+            return array.array('q', values)
+    return None
+
+
+def _pack_numeric_arrays(obj):
+    """Remplacer récursivement les listes numériques par des array.array"""
+    if isinstance(obj, dict):
+        return {k: _pack_numeric_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        packed = _as_numeric_array(obj)
+        if packed is not None:
+            return packed
+        return [_pack_numeric_arrays(v) for v in obj]
+    return obj
+
+
+class MsgpackCodec:
+    """Codec binaire MessagePack.
+
+    Les tableaux de nombres homogènes sont transmis sous forme d'extension
+    (code de type + octets bruts little-endian de array.array) plutôt qu'élément
+    par élément, ce qui évite tout formatage texte des valeurs. Ce codec exige
+    un découpage par préfixe de longueur, les messages pouvant contenir '\\n'.
+    """
+
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+
+    @staticmethod
+    def _default(obj):
+        if isinstance(obj, array.array):
+            if sys.byteorder == "big":
+                obj = array.array(obj.typecode, obj)
+                obj.byteswap()
+            return msgpack.ExtType(NUMERIC_ARRAY_EXT, obj.typecode.encode('ascii') + obj.tobytes())
+        raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+    @staticmethod
+    def _ext_hook(code, data):
+        if code == NUMERIC_ARRAY_EXT:
+            values = array.array(data[:1].decode('ascii'))
+            values.frombytes(data[1:])
+            if sys.byteorder == "big":
+                values.byteswap()
+            return values.tolist()
+        return msgpack.ExtType(code, data)
+
+    def encode(self, obj):
+        return msgpack.packb(_pack_numeric_arrays(obj), use_bin_type=True, default=self._default)
+
+    def decode(self, data):
+        try:
+            return msgpack.unpackb(data, raw=False, ext_hook=self._ext_hook,
+                                   strict_map_key=False)
+        except ValueError as e:
+            raise CodecError(str(e)) from e
+
+
+def available_codecs():
+    """Noms des codecs utilisables ici, par ordre de préférence"""
+    names = []
+    if msgpack is not None:
+        names.append(MsgpackCodec.name)
+    names.append(JsonCodec.name)
+    return names
+
+
+def get_codec(name="json"):
+    """Instancier un codec à partir de son nom"""
+    if name == JsonCodec.name:
+        return JsonCodec()
+    if name == MsgpackCodec.name:
+        return MsgpackCodec()
+    raise ValueError(f"Unknown codec: {name}")
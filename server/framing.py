@@ -0,0 +1,104 @@
+import struct
+
+# Modes de découpage des messages sur le socket
+NEWLINE = "newline"
+LENGTH_PREFIXED = "length"
+
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024 * 1024
+_LENGTH_HEADER = struct.Struct(">I")
+
+
+class FrameTooLarge(ValueError):
+    """Un message dépasse la taille maximale négociée"""
+
+
+class FrameReader:
+    """Lecteur de messages incrémental pour un flux d'octets.
+
+    Les octets reçus sont accumulés dans un bytearray unique (via recv_into sur
+    un tampon réutilisé), le délimiteur n'est recherché que dans les octets
+    nouvellement arrivés et les octets qui suivent un message complet sont
+    conservés pour le message suivant. Le décodage UTF-8 se fait une seule fois,
+    sur le message complet, par l'appelant.
+    """
+
+    def __init__(self, mode=NEWLINE, max_frame_size=DEFAULT_MAX_FRAME_SIZE, chunk_size=65536):
+        if mode not in (NEWLINE, LENGTH_PREFIXED):
+            raise ValueError(f"Unknown framing mode: {mode}")
+        self.mode = mode
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        self._chunk = bytearray(chunk_size)
+        self._chunk_view = memoryview(self._chunk)
+
+    def pending_bytes(self):
+        """Nombre d'octets reçus mais pas encore consommés"""
+        return len(self._buffer)
+
+    def _take(self, start, end, consumed):
+        """Extraire buffer[start:end] puis retirer les `consumed` premiers octets"""
+        with memoryview(self._buffer) as view:
+            frame = bytes(view[start:end])
+        # Suppression en tête de bytearray : amortie en O(1) sous CPython
+        del self._buffer[:consumed]
+        self._scan_pos = 0
+        return frame
+
+    def next_frame(self):
+        """Retourner le prochain message complet déjà reçu, ou None"""
+        buffer = self._buffer
+        if self.mode == NEWLINE:
+            index = buffer.find(b"\n", self._scan_pos)
+            if index < 0:
+                self._scan_pos = len(buffer)
+                if len(buffer) > self.max_frame_size:
+                    raise FrameTooLarge(f"Frame exceeds {self.max_frame_size} bytes without delimiter")
+                return None
+            if index > self.max_frame_size:
+                raise FrameTooLarge(f"Frame of {index} bytes exceeds {self.max_frame_size} bytes")
+            return self._take(0, index, index + 1)
+
+        header_size = _LENGTH_HEADER.size
+        if len(buffer) < header_size:
+            return None
+        (length,) = _LENGTH_HEADER.unpack_from(buffer)
+        if length > self.max_frame_size:
+            raise FrameTooLarge(f"Frame of {length} bytes exceeds {self.max_frame_size} bytes")
+        end = header_size + length
+        if len(buffer) < end:
+            return None
+        return self._take(header_size, end, end)
+
+    def feed(self, data):
+        """Ajouter des octets reçus et retourner la liste des messages complets"""
+        self._buffer += data
+        frames = []
+        frame = self.next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self.next_frame()
+        return frames
+
+    def read_frame(self, sock):
+        """Lire sur le socket jusqu'à obtenir un message complet"""
+        frame = self.next_frame()
+        while frame is None:
+            received = sock.recv_into(self._chunk_view)
+            if not received:
+                raise ConnectionError("Connection closed by TouchDesigner")
+            self._buffer += self._chunk_view[:received]
+            frame = self.next_frame()
+        return frame
+
+    def reset(self):
+        """Oublier les octets en attente (après une erreur de protocole)"""
+        self._buffer.clear()
+        self._scan_pos = 0
+
+
+def encode_frame(payload, mode=NEWLINE):
+    """Encadrer un message pour l'envoi selon le mode choisi"""
+    if mode == NEWLINE:
+        return payload + b"\n"
+    return _LENGTH_HEADER.pack(len(payload)) + payload
@@ -0,0 +1,44 @@
+# Configuration gunicorn du serveur MCP en production :
+#   cd server && gunicorn -c gunicorn.conf.py
+import os
+import sys
+
+wsgi_app = "server:app"
+bind = os.environ.get("MCP_BIND", "0.0.0.0:5000")
+
+# Un seul processus par défaut : les métriques de /mcp/metrics sont tenues en
+# mémoire, par processus ; avec plusieurs workers, chaque scrape tomberait sur
+# un worker quelconque et les compteurs sembleraient repartir de zéro. La
+# concurrence vient des threads, les appels passant surtout leur temps à
+# attendre TouchDesigner.
+# Chaque worker a son propre pool de connexions TouchDesigner (TD_POOL_SIZE
+# connexions) : le nombre total de connexions est workers x TD_POOL_SIZE
+workers = int(os.environ.get("MCP_WORKERS", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("MCP_THREADS", 16))
+
+# L'application est importée dans chaque worker après le fork : un socket
+# ouvert avant le fork serait partagé entre processus
+preload_app = False
+
+# Arrêt progressif : un worker qui reçoit SIGTERM finit ses requêtes en cours
+graceful_timeout = int(os.environ.get("MCP_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("MCP_TIMEOUT", 60))
+keepalive = int(os.environ.get("MCP_KEEPALIVE", 5))
+
+accesslog = os.environ.get("MCP_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.environ.get("MCP_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    if workers > 1:
+        server.log.warning("MCP_WORKERS=%d: /mcp/metrics only reports the worker that "
+                           "answers each scrape", workers)
+
+
+def worker_exit(server, worker):
+    """Fermer proprement le pool TouchDesigner du worker"""
+    app_module = sys.modules.get("server")
+    if app_module is not None and hasattr(app_module, "shutdown"):
+        app_module.shutdown(drain_timeout=0)
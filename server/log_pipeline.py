@@ -0,0 +1,209 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+
+# Taille maximale (en caractères) d'un corps journalisé ; 0 : pas de limite
+MAX_PAYLOAD = int(os.environ.get("MCP_LOG_MAX_PAYLOAD", 1024))
+# Limite appliquée aux corps complets des appels lents ou en échec
+MAX_FULL_PAYLOAD = int(os.environ.get("MCP_LOG_MAX_FULL_PAYLOAD", 1024 * 1024))
+# Au-delà de cette durée, un appel est journalisé avec ses corps complets
+SLOW_MS = float(os.environ.get("MCP_LOG_SLOW_MS", os.environ.get("TD_TRACE_SLOW_MS", 500)))
+# Proportion d'appels réussis journalisés, par méthode JSON-RPC
+# ("tools_execute=0.1,system_status=0") et pour les autres méthodes
+DEFAULT_SAMPLE_RATE = float(os.environ.get("MCP_LOG_SAMPLE_DEFAULT", 1.0))
+# Nombre d'enregistrements en attente d'écriture au-delà duquel ils sont abandonnés
+QUEUE_SIZE = int(os.environ.get("MCP_LOG_QUEUE_SIZE", 10000))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def parse_sample_rates(spec):
+    """Lire "methode=taux,methode=taux" en dictionnaire {méthode: taux}"""
+    rates = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            raise ValueError(f"Invalid sample rate for {name.strip()!r}: {rate!r}")
+    return rates
+
+
+SAMPLE_RATES = parse_sample_rates(os.environ.get("MCP_LOG_SAMPLE", ""))
+
+
+class Payload:
+    """Corps de requête ou de réponse à journaliser.
+
+    La sérialisation et la troncature n'ont lieu qu'au formatage, donc dans le
+    thread d'écriture et seulement si l'enregistrement est effectivement émis.
+    La valeur ne doit plus être modifiée une fois journalisée.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit=None):
+        self.value = value
+        self.limit = MAX_PAYLOAD if limit is None else limit
+
+    def __str__(self):
+        if isinstance(self.value, (str, bytes)):
+            text = self.value if isinstance(self.value, str) else self.value.decode("utf-8", "replace")
+        else:
+            try:
+                text = json.dumps(self.value, ensure_ascii=False, default=str)
+            except (TypeError, ValueError):
+                text = repr(self.value)
+        if self.limit and len(text) > self.limit:
+            return f"{text[:self.limit]}... (+{len(text) - self.limit} chars)"
+        return text
+
+    def to_json(self):
+        return str(self)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui laisse tout le formatage au thread d'écriture.
+
+    QueueHandler.prepare() formate le message dans le thread appelant ; ici
+    l'enregistrement est transmis tel quel et la file est bornée : quand
+    l'écriture ne suit pas, les enregistrements sont comptés puis abandonnés
+    plutôt que de bloquer le thread de la requête.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    """Format texte habituel, suivi des champs structurés (clé=valeur)"""
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne, champs structurés au premier niveau"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            entry[key] = str(value) if isinstance(value, Payload) else value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# Journaux de requêtes et réponses intégrés à jsonrpcserver
+JSONRPC_LOGGERS = ("jsonrpcserver.dispatcher.request", "jsonrpcserver.dispatcher.response")
+
+_listener = None
+_queue_handler = None
+
+
+def setup(level=None):
+    """Installer la journalisation asynchrone sur le logger racine.
+
+    Les enregistrements passent par une file ; un thread d'arrière-plan les
+    formate (MCP_LOG_FORMAT=text ou json) et les écrit sur stderr ou dans
+    MCP_LOG_FILE. Sans effet si le logger racine est déjà configuré.
+
+    Les loggers de jsonrpcserver, qui journalisent chaque requête et chaque
+    réponse en entier, sont limités aux avertissements : log_call est le seul
+    journal des appels.
+    """
+    global _listener, _queue_handler
+    for name in JSONRPC_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    root = logging.getLogger()
+    if _listener is not None or root.handlers:
+        return
+    if level is None:
+        level = os.environ.get("MCP_LOG_LEVEL", "INFO").upper()
+
+    log_file = os.environ.get("MCP_LOG_FILE")
+    target = logging.FileHandler(log_file) if log_file else logging.StreamHandler()
+    if os.environ.get("MCP_LOG_FORMAT", "text").lower() == "json":
+        target.setFormatter(JsonFormatter())
+    else:
+        target.setFormatter(TextFormatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(QUEUE_SIZE)
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    atexit.register(stop)
+
+
+def stop():
+    """Vider la file puis arrêter le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records():
+    """Nombre d'enregistrements abandonnés faute de place dans la file"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def sampled(method):
+    rate = SAMPLE_RATES.get(method, DEFAULT_SAMPLE_RATE)
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def log_call(logger, method, request_body, response_body, duration, failed):
+    """Journaliser un appel JSON-RPC terminé.
+
+    Les appels lents ou en échec sont journalisés en WARNING avec leurs corps
+    complets ; les autres, selon le taux d'échantillonnage de leur méthode,
+    en INFO avec des corps tronqués.
+    """
+    duration_ms = round(duration * 1000, 3)
+    if failed or duration_ms >= SLOW_MS:
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        logger.warning("JSON-RPC %s %s", method, "failed" if failed else "slow", extra={"fields": {
+            "method": method,
+            "duration_ms": duration_ms,
+            "request": Payload(request_body, MAX_FULL_PAYLOAD),
+            "response": Payload(response_body, MAX_FULL_PAYLOAD),
+        }})
+    elif logger.isEnabledFor(logging.INFO) and sampled(method):
+        logger.info("JSON-RPC %s", method, extra={"fields": {
+            "method": method,
+            "duration_ms": duration_ms,
+            "request": Payload(request_body),
+            "response": Payload(response_body),
+        }})
@@ -0,0 +1,28 @@
+from mcp_common.pagination import normalize_type_filter, paginate
+
+
+def paginate_project_info(result_data, parameters):
+    """Appliquer pagination et projection à la liste d'opérateurs de get_project_info.
+
+    Ne borne que la taille de la réponse renvoyée au client : TouchDesigner a
+    déjà construit et sérialisé la liste complète, que le connecteur reçoit en
+    entier, et chaque page la redemande (un parcours complet coûte O(N²)).
+
+    Les versions de TouchDesigner qui paginent elles-mêmes (les paramètres
+    limit, cursor, fields... leur sont transmis) renvoient déjà un
+    "next_cursor" ; la réponse, bornée à la source, est alors transmise telle quelle.
+    """
+    if not isinstance(result_data, dict) or not isinstance(result_data.get("operators"), list):
+        return result_data
+    if "next_cursor" in result_data:
+        return result_data
+    # Le type TouchDesigner est "noise" : accepter aussi le nom de classe "noiseTOP"
+    operator_type, family = normalize_type_filter(parameters.get("operator_type"), parameters.get("family"))
+    filters = {"family": family, "type": operator_type}
+    query = {"tool": "get_project_info", "filters": filters}
+    operators, next_cursor, total = paginate(result_data["operators"], query,
+                                             limit=parameters.get("limit"),
+                                             cursor=parameters.get("cursor"),
+                                             fields=parameters.get("fields"),
+                                             filters=filters)
+    return dict(result_data, operators=operators, next_cursor=next_cursor, total_operators=total)
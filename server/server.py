@@ -1,31 +1,97 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+import os
 import json
+import time
+import signal
+import sys
 import logging
-from tools import get_all_tools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Modules partagés avec les serveurs FastMCP, dans mcp_common/ à la racine du dépôt
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools import TOOL_REGISTRY
 from td_connector import TouchDesignerConnector
+from pagination import paginate_project_info
+import metrics
+from mcp_common import tracing
+import log_pipeline
 from jsonrpcserver import method, dispatch
-from jsonrpcserver.response import Response, ErrorResponse
+from jsonrpcserver.exceptions import ApiError
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Configuration du logging : formatage et écriture dans un thread d'arrière-plan
+log_pipeline.setup()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Permettre les requêtes cross-origin
 
-# Initialiser la connexion TouchDesigner
-td_connector = TouchDesignerConnector(host="localhost", port=7001)
+# Initialiser le pool de connexions TouchDesigner
+td_connector = TouchDesignerConnector(
+    host=os.environ.get("TD_HOST", "localhost"),
+    port=int(os.environ.get("TD_PORT", 7001)),
+    pool_size=int(os.environ.get("TD_POOL_SIZE", 4)),
+    idle_timeout=float(os.environ.get("TD_POOL_IDLE_TIMEOUT", 60)),
+    multiplex=os.environ.get("TD_MULTIPLEX", "0") == "1",
+    framing=os.environ.get("TD_FRAMING", "newline"),
+    max_frame_size=int(os.environ.get("TD_MAX_FRAME_SIZE", 64 * 1024 * 1024)),
+    codec=os.environ.get("TD_CODEC", "json"),
+)
+
+# Exécution concurrente des lots JSON-RPC
+batch_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("JSONRPC_BATCH_WORKERS", 8)),
+                                    thread_name_prefix="jsonrpc-batch")
+
+# Méthodes sans effet de bord, exécutables en parallèle dans un lot
+READ_ONLY_METHODS = {"resources_list", "prompts_list", "system_status"}
+READ_ONLY_TOOLS = TOOL_REGISTRY.read_only
+
+# Métriques Prometheus (/mcp/metrics) ; les noms d'outils inconnus sont
+# regroupés sous "other" pour borner le nombre de séries
+KNOWN_TOOLS = TOOL_REGISTRY.names
+TOOL_CALLS = metrics.counter("td_mcp_tool_calls_total", "Appels d'outils", ["tool"])
+TOOL_ERRORS = metrics.counter("td_mcp_tool_errors_total", "Appels d'outils en erreur", ["tool"])
+TOOL_SECONDS = metrics.histogram("td_mcp_tool_duration_seconds",
+                                 "Durée d'exécution d'un outil (attente du pool et TouchDesigner compris)", ["tool"])
+VALIDATION_SECONDS = metrics.histogram("td_mcp_validation_duration_seconds",
+                                       "Durée de validation des paramètres d'un outil", ["tool"],
+                                       buckets=(0.000005, 0.00001, 0.000025, 0.00005, 0.0001,
+                                                0.00025, 0.0005, 0.001, 0.0025, 0.005))
+VALIDATION_ERRORS = metrics.counter("td_mcp_validation_errors_total",
+                                    "Appels d'outils rejetés par la validation des paramètres", ["tool"])
+HTTP_SECONDS = metrics.histogram("td_mcp_http_request_duration_seconds",
+                                 "Durée de traitement des requêtes HTTP par Flask", ["endpoint"])
+HTTP_RESPONSES = metrics.counter("td_mcp_http_responses_total", "Réponses HTTP", ["endpoint", "status"])
+HTTP_IN_FLIGHT = metrics.gauge("td_mcp_http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+metrics.gauge("td_mcp_log_records_dropped", "Enregistrements de log abandonnés (file d'écriture pleine)",
+              collect=log_pipeline.dropped_records)
+metrics.gauge("td_connector_connected", "1 si la connexion à TouchDesigner est établie",
+              collect=lambda: 1 if td_connector.is_connected() else 0)
+metrics.gauge("td_connector_pool_connections", "Connexions du pool par état", ["state"],
+              collect=lambda: {(state,): value for state, value in td_connector.pool_stats().items()
+                               if state in ("open", "idle", "in_use", "in_flight")})
+
+
+def tool_label(tool_name):
+    return tool_name if tool_name in KNOWN_TOOLS else "other"
+
+def validate_tool_call(tool_name, parameters):
+    """Valider les paramètres d'un outil contre son schéma, sans aller-retour TouchDesigner"""
+    label = tool_label(tool_name)
+    started = time.perf_counter()
+    with tracing.span("validate"):
+        errors = TOOL_REGISTRY.validate(tool_name, parameters)
+    VALIDATION_SECONDS.observe(time.perf_counter() - started, tool=label)
+    if errors:
+        VALIDATION_ERRORS.inc(tool=label)
+    return errors
 
 # Méthodes MCP via JSON-RPC
 @method
 def resources_list():
     """Liste des ressources disponibles dans TouchDesigner"""
-    tools = get_all_tools()
-    resources = [{"id": tool["name"], "name": tool["description"], "type": "tool"} 
-                 for tool in tools]
-    return Response(resources)
+    return TOOL_REGISTRY.resource_list()
 
 @method
 def prompts_list():
@@ -35,7 +101,7 @@ def prompts_list():
         {"id": "create_object", "name": "Créer un objet dans TouchDesigner"},
         {"id": "modify_parameter", "name": "Modifier un paramètre"}
     ]
-    return Response(prompts)
+    return prompts
 
 @method
 def tools_execute(tool_name, parameters=None):
@@ -43,38 +109,221 @@ def tools_execute(tool_name, parameters=None):
     if parameters is None:
         parameters = {}
     
-    logger.info(f"Running tool: {tool_name} with parameters: {parameters}")
+    # Les paramètres (scripts, dumps d'opérateurs) ne sont formatés que si DEBUG est actif
+    logger.debug("Running tool %s", tool_name,
+                 extra={"fields": {"parameters": log_pipeline.Payload(parameters)}})
     
+    errors = validate_tool_call(tool_name, parameters)
+    if errors:
+        # Erreur JSON-RPC -32602 dont le message détaille les champs en cause
+        raise ApiError(f"Invalid parameters for {tool_name}: {'; '.join(errors)}", code=-32602, data=errors)
+
+    label = tool_label(tool_name)
+    TOOL_CALLS.inc(tool=label)
+    started = time.monotonic()
     try:
         # Exécuter l'outil dans TouchDesigner
         result_data = td_connector.execute_tool(tool_name, parameters)
-        return Response({"result": result_data})
+        if isinstance(result_data, dict) and "error" in result_data:
+            TOOL_ERRORS.inc(tool=label)
+        if tool_name == "get_project_info":
+            result_data = paginate_project_info(result_data, parameters)
+        return {"result": result_data}
     except Exception as e:
+        TOOL_ERRORS.inc(tool=label)
         logger.error(f"Error running tool: {str(e)}")
-        return ErrorResponse(-32000, str(e))
+        raise ApiError(str(e), code=-32000)
+    finally:
+        TOOL_SECONDS.observe(time.monotonic() - started, tool=label)
+
+@method
+def tools_execute_batch(commands, stop_on_error=True):
+    """Exécuter une liste ordonnée d'outils en un seul aller-retour TouchDesigner"""
+    if not isinstance(commands, list) or not commands:
+        raise ApiError("commands must be a non-empty list", code=-32602)
+    for index, command in enumerate(commands):
+        if not isinstance(command, dict) or not isinstance(command.get("tool_name"), str):
+            raise ApiError(f"commands[{index}] must have a tool_name", code=-32602)
+    # Rejeter le lot entier avant tout envoi si une commande est invalide
+    for index, command in enumerate(commands):
+        errors = validate_tool_call(command["tool_name"], command.get("parameters") or {})
+        if errors:
+            raise ApiError(f"Invalid parameters for commands[{index}] "
+                           f"({command['tool_name']}): {'; '.join(errors)}", code=-32602, data=errors)
+
+    logger.debug("Running batch of %d tools (stop_on_error=%s)", len(commands), stop_on_error)
+
+    try:
+        raw_results = td_connector.execute_batch(commands, stop_on_error=stop_on_error)
+    except Exception as e:
+        logger.error(f"Error running batch: {str(e)}")
+        raise ApiError(str(e), code=-32000)
+
+    # Un résultat par commande, dans l'ordre ; les commandes non exécutées
+    # après une erreur (stop_on_error) sont marquées "skipped"
+    results = []
+    failed = 0
+    for index, command in enumerate(commands):
+        item = {"index": index, "tool_name": command["tool_name"]}
+        if index >= len(raw_results):
+            item["status"] = "skipped"
+        else:
+            result_data = raw_results[index]
+            TOOL_CALLS.inc(tool=tool_label(command["tool_name"]))
+            if isinstance(result_data, dict) and "error" in result_data:
+                TOOL_ERRORS.inc(tool=tool_label(command["tool_name"]))
+                item["status"] = "error"
+                item["error"] = result_data["error"]
+                failed += 1
+            else:
+                item["status"] = "ok"
+                item["result"] = result_data
+        results.append(item)
+
+    return {
+        "results": results,
+        "completed": min(len(raw_results), len(commands)),
+        "failed": failed
+    }
 
 @method
 def system_status():
     """Vérifier l'état de la connexion"""
     if td_connector.is_connected():
-        return Response({"status": "connected", "message": "Connected to TouchDesigner"})
+        return {"status": "connected", "message": "Connected to TouchDesigner"}
     else:
-        return ErrorResponse(-32001, "Not connected to TouchDesigner")
+        raise ApiError("Not connected to TouchDesigner", code=-32001)
+
+def is_read_only_call(call):
+    """Un appel JSON-RPC peut-il s'exécuter en parallèle d'autres appels ?"""
+    if not isinstance(call, dict):
+        return False
+    name = call.get("method")
+    if name in READ_ONLY_METHODS:
+        return True
+    if name == "tools_execute":
+        params = call.get("params")
+        tool_name = params.get("tool_name") if isinstance(params, dict) else None
+        return tool_name in READ_ONLY_TOOLS
+    return False
+
+def is_error_response(response_text):
+    """Vérifier si une réponse JSON-RPC porte un membre "error" de premier niveau"""
+    if not response_text:
+        return False
+    try:
+        envelope = json.loads(response_text)
+    except ValueError:
+        return True
+    return isinstance(envelope, dict) and "error" in envelope
+
+def dispatch_one(call, trace_id=None):
+    """Traiter un appel d'un lot et retourner sa réponse désérialisée (None si notification)"""
+    name = call.get("method") if isinstance(call, dict) else None
+    with tracing.trace(f"jsonrpc:{name}", trace_id), tracing.span("dispatch"):
+        # dispatch attend un texte JSON : chaque appel du lot est re-sérialisé
+        response_text = str(dispatch(json.dumps(call)))
+    return json.loads(response_text) if response_text else None
+
+def dispatch_batch(calls):
+    """Traiter un lot JSON-RPC 2.0.
+
+    Les appels en lecture seule consécutifs sont exécutés en parallèle ; les
+    appels qui modifient le projet servent de barrière et s'exécutent seuls,
+    dans l'ordre du lot. L'ordre des réponses suit celui des appels.
+    """
+    responses = []
+    segment = []
+    # Chaque appel du lot a sa trace, rattachée à celle de la requête HTTP
+    parent = tracing.current_trace()
+    parent_id = parent.trace_id if parent is not None else tracing.new_trace_id()
+
+    def flush():
+        if len(segment) == 1:
+            responses.append(dispatch_one(*segment[0]))
+        elif segment:
+            responses.extend(batch_executor.map(lambda item: dispatch_one(*item), segment))
+        segment.clear()
+
+    for index, call in enumerate(calls):
+        item = (call, f"{parent_id}-{index}")
+        if is_read_only_call(call):
+            segment.append(item)
+        else:
+            flush()
+            responses.append(dispatch_one(*item))
+    flush()
+
+    # Les notifications n'ont pas de réponse
+    return [r for r in responses if r is not None]
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.monotonic()
+    HTTP_IN_FLIGHT.inc()
+    # L'identifiant de trace peut être fourni par l'appelant
+    g.trace = tracing.begin(request.path, request.headers.get("X-Trace-Id"))
+
+
+@app.after_request
+def count_response(response):
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+    trace = g.get("trace")
+    if trace is not None:
+        response.headers["X-Trace-Id"] = trace.trace_id
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc=None):
+    trace = g.pop("trace", None)
+    if trace is not None:
+        tracing.end(trace)
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    HTTP_IN_FLIGHT.dec()
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    HTTP_SECONDS.observe(time.monotonic() - started, endpoint=endpoint)
 
 # Endpoint JSON-RPC principal
 @app.route("/", methods=["POST"])
 def handle_jsonrpc():
-    request_data = request.get_json()
-    logger.info(f"Received JSON-RPC request: {request_data}")
-    response = dispatch(request_data)
-    logger.info(f"Sending JSON-RPC response: {response}")
-    return response
+    started = time.perf_counter()
+    with tracing.span("parse"):
+        # Un JSON invalide est laissé à dispatch, qui répond -32700
+        request_data = request.get_json(silent=True)
+    if isinstance(request_data, list) and request_data:
+        responses = dispatch_batch(request_data)
+        log_pipeline.log_call(logger, "batch", request_data, responses, time.perf_counter() - started,
+                              failed=any(isinstance(r, dict) and "error" in r for r in responses))
+        if not responses:
+            return "", 204
+        return jsonify(responses)
+    trace = tracing.current_trace()
+    if trace is not None and isinstance(request_data, dict):
+        trace.name = f"jsonrpc:{request_data.get('method')}"
+    with tracing.span("dispatch"):
+        # dispatch attend le texte JSON brut de la requête
+        response = str(dispatch(request.get_data(as_text=True)))
+    name = request_data.get("method") if isinstance(request_data, dict) else None
+    log_pipeline.log_call(logger, name or "invalid", request_data, response,
+                          time.perf_counter() - started, failed=is_error_response(response))
+    if not response:
+        # Notification : pas de réponse
+        return "", 204
+    return app.response_class(response, mimetype="application/json")
 
 # Gardez également vos anciens endpoints REST pour la compatibilité
 @app.route('/mcp/tools', methods=['GET'])
 def get_tools():
-    tools = get_all_tools()
-    return jsonify(tools)
+    # Corps pré-sérialisé ; 304 si le client a déjà cette version (If-None-Match)
+    response = app.response_class(TOOL_REGISTRY.json_bytes, mimetype="application/json")
+    response.set_etag(TOOL_REGISTRY.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 @app.route('/mcp/status', methods=['GET'])
 def get_status():
@@ -83,5 +332,55 @@ def get_status():
     else:
         return jsonify({"status": "disconnected", "message": "Not connected to TouchDesigner"}), 503
 
+@app.route('/mcp/metrics', methods=['GET'])
+def get_metrics():
+    """Métriques au format texte Prometheus"""
+    return metrics.registry.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+def shutdown(drain_timeout=None):
+    """Attendre la fin des requêtes en cours puis fermer le pool TouchDesigner"""
+    if drain_timeout is None:
+        drain_timeout = float(os.environ.get("MCP_GRACEFUL_TIMEOUT", 30))
+    deadline = time.monotonic() + drain_timeout
+    while HTTP_IN_FLIGHT.value() > 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if HTTP_IN_FLIGHT.value() > 0:
+        logger.warning(f"Closing with {HTTP_IN_FLIGHT.value()} requests still in flight")
+    batch_executor.shutdown(wait=False)
+    td_connector.close()
+
+
+def serve(host, port):
+    """Servir l'application sans gunicorn (Windows notamment).
+
+    Serveur Werkzeug multithreadé sans débogueur ni rechargement ; SIGTERM ou
+    Ctrl+C arrête d'accepter des connexions puis laisse finir les requêtes
+    en cours (voir shutdown()).
+    """
+    from werkzeug.serving import make_server
+    httpd = make_server(host, port, app, threaded=True)
+    logger.info(f"Serving on http://{host}:{port}")
+
+    def stop(signum, frame):
+        logger.info("Shutting down, draining in-flight requests")
+        # shutdown() attend la fin de serve_forever : pas depuis le gestionnaire de signal
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, stop)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        shutdown()
+
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    host = os.environ.get("MCP_HOST", "0.0.0.0")
+    port = int(os.environ.get("MCP_PORT", 5000))
+    if os.environ.get("MCP_DEBUG", "0") == "1":
+        # Serveur de développement : débogueur et rechargement automatique
+        app.run(host=host, port=port, debug=True)
+    else:
+        serve(host, port)
\ No newline at end of file
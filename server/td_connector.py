@@ -1,77 +1,625 @@
 import socket
+import select
 import json
 import time
 import logging
 import threading
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from framing import (FrameReader, FrameTooLarge, encode_frame, NEWLINE, LENGTH_PREFIXED,
+                     DEFAULT_MAX_FRAME_SIZE)
+from codec import CodecError, available_codecs, get_codec
+import metrics
+from mcp_common import tracing
 
 logger = logging.getLogger(__name__)
 
+# Champ optionnel des réponses : temps d'exécution côté TouchDesigner, en ms
+TD_EXEC_FIELD = "td_exec_ms"
+
+# Métriques exposées par /mcp/metrics
+BYTES_SENT = metrics.counter("td_connector_bytes_sent_total",
+                             "Octets de commandes envoyés à TouchDesigner")
+BYTES_RECEIVED = metrics.counter("td_connector_bytes_received_total",
+                                 "Octets de réponses reçus de TouchDesigner")
+ROUNDTRIP_SECONDS = metrics.histogram("td_connector_roundtrip_seconds",
+                                      "Durée entre l'envoi d'une commande et sa réponse")
+WAIT_SECONDS = metrics.histogram("td_connector_wait_seconds",
+                                 "Attente d'une connexion du pool ou d'un créneau multiplexé")
+CONNECTIONS_OPENED = metrics.counter("td_connector_connections_opened_total",
+                                     "Connexions ouvertes vers TouchDesigner")
+RECONNECTS = metrics.counter("td_connector_reconnects_total",
+                             "Connexions ouvertes pour remplacer une connexion perdue")
+COMMAND_ERRORS = metrics.counter("td_connector_command_errors_total",
+                                 "Commandes en échec (connexion, délai, message invalide)")
+IN_FLIGHT = metrics.gauge("td_connector_in_flight",
+                          "Commandes en cours (attente du pool comprise)")
+
+
+def negotiate(sock, reader, framing, max_frame_size, codec_name="json"):
+    """Proposer un mode de découpage et un codec à TouchDesigner.
+
+    La poignée de main est échangée en JSON et en mode ligne ; si TouchDesigner
+    ne la comprend pas (ou refuse ce qui est proposé), la connexion reste en
+    JSON et en mode ligne. Un codec binaire impose le préfixe de longueur.
+    Retourne le triplet (mode, taille maximale, codec) retenu.
+    """
+    default = (NEWLINE, max_frame_size, get_codec("json"))
+    if codec_name == "auto":
+        codec_name = available_codecs()[0]
+    if codec_name != "json" and codec_name not in available_codecs():
+        logger.warning(f"Codec {codec_name} is not available, using json")
+        codec_name = "json"
+    if codec_name != "json" and get_codec(codec_name).binary:
+        framing = LENGTH_PREFIXED
+    if framing == NEWLINE and codec_name == "json":
+        return default
+
+    offered = [codec_name] if codec_name == "json" else [codec_name, "json"]
+    hello = {"action": "hello", "framing": framing, "max_frame_size": max_frame_size,
+             "codecs": offered}
+    sock.sendall(encode_frame(json.dumps(hello).encode('utf-8')))
+    try:
+        reply = json.loads(reader.read_frame(sock).decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return default
+    if not isinstance(reply, dict) or reply.get("framing") not in (NEWLINE, framing):
+        return default
+    framing = reply["framing"]
+    peer_max = reply.get("max_frame_size")
+    if isinstance(peer_max, int) and peer_max > 0:
+        max_frame_size = min(max_frame_size, peer_max)
+    chosen = reply.get("codec", "json")
+    if chosen not in offered:
+        chosen = "json"
+    codec = get_codec(chosen)
+    if codec.binary and framing == NEWLINE:
+        codec = get_codec("json")
+    return framing, max_frame_size, codec
+
+
+class PoolTimeout(TimeoutError):
+    """Aucune connexion (ou place dans la connexion multiplexée) libérée à temps.
+
+    Le pool est saturé, pas TouchDesigner injoignable : l'état de connexion
+    n'en dépend pas.
+    """
+
+
+def is_unknown_action(response, action):
+    """Vérifier si TouchDesigner a refusé une commande parce qu'il ne connaît pas son action"""
+    if not isinstance(response, dict) or not isinstance(response.get("error"), str):
+        return False
+    error = response["error"].lower()
+    return action in error and any(word in error for word in ("unknown", "unsupported", "not supported"))
+
+
+class TDConnection:
+    """Une connexion socket individuelle vers TouchDesigner"""
+
+    def __init__(self, host, port, connect_timeout=5.0, timeout=30.0,
+                 framing=NEWLINE, max_frame_size=DEFAULT_MAX_FRAME_SIZE, codec="json"):
+        self.host = host
+        self.port = port
+        self.socket = socket.create_connection((host, port), timeout=connect_timeout)
+        self.socket.settimeout(timeout)
+        self.reader = FrameReader(NEWLINE, max_frame_size)
+        self.framing, self.reader.max_frame_size, self.codec = negotiate(
+            self.socket, self.reader, framing, max_frame_size, codec)
+        self.reader.mode = self.framing
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.healthy = True
+        self.commands_sent = 0
+        self.failures = 0
+
+    def idle_time(self):
+        """Temps (en secondes) depuis la dernière utilisation"""
+        return time.monotonic() - self.last_used
+
+    def is_alive(self):
+        """Vérifier sans bloquer que le pair n'a pas fermé la connexion"""
+        if not self.healthy or self.socket is None:
+            return False
+        try:
+            readable, _, _ = select.select([self.socket], [], [], 0)
+            if readable:
+                # Un socket lisible au repos est soit fermé, soit désynchronisé
+                return self.socket.recv(1, socket.MSG_PEEK) != b""
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def request(self, command):
+        """Envoyer une commande et retourner le message de réponse brut"""
+        # Ajouter un délimiteur (ou un préfixe de longueur) de fin de commande
+        payload = encode_frame(self.codec.encode(command), self.framing)
+        started = time.monotonic()
+        with tracing.span("send"):
+            self.socket.sendall(payload)
+        BYTES_SENT.inc(len(payload))
+
+        # Attendre et lire la réponse ; les octets suivants restent dans le lecteur
+        try:
+            with tracing.span("receive"):
+                frame = self.reader.read_frame(self.socket)
+        except FrameTooLarge:
+            # Le reste du message est encore sur le socket : connexion inutilisable
+            self.healthy = False
+            raise
+
+        self.commands_sent += 1
+        self.last_used = time.monotonic()
+        ROUNDTRIP_SECONDS.observe(self.last_used - started)
+        BYTES_RECEIVED.inc(len(frame))
+        return frame
+
+    def close(self):
+        """Fermer la connexion"""
+        self.healthy = False
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+
+
+class WaitStats:
+    """Temps passé à attendre une connexion du pool ou un créneau multiplexé"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        WAIT_SECONDS.observe(seconds)
+        tracing.record_span("connector_wait", seconds)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_seconds": self.total,
+                "max_seconds": self.max,
+                "mean_seconds": self.total / self.count if self.count else 0.0,
+            }
+
+
+class _PendingReply:
+    """Réponse attendue pour une commande multiplexée"""
+
+    __slots__ = ("event", "response", "error", "decode_seconds")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+        self.decode_seconds = 0.0
+
+
+class MultiplexedConnection:
+    """Connexion unique portant plusieurs commandes simultanées.
+
+    Chaque commande reçoit un champ "id" que TouchDesigner recopie dans sa
+    réponse ; un thread lecteur en arrière-plan route chaque réponse vers
+    l'appelant qui l'attend. Les commandes sont ainsi pipelinées sur le socket
+    au lieu d'attendre chacune un aller-retour complet.
+    """
+
+    def __init__(self, host, port, connect_timeout=5.0, max_in_flight=64,
+                 framing=NEWLINE, max_frame_size=DEFAULT_MAX_FRAME_SIZE, codec="json",
+                 wait_stats=None):
+        self.host = host
+        self.port = port
+        self.wait_stats = wait_stats if wait_stats is not None else WaitStats()
+        self.socket = socket.create_connection((host, port), timeout=connect_timeout)
+        self.reader = FrameReader(NEWLINE, max_frame_size)
+        self.framing, self.reader.max_frame_size, self.codec = negotiate(
+            self.socket, self.reader, framing, max_frame_size, codec)
+        self.reader.mode = self.framing
+        # Le lecteur bloque indéfiniment, les délais sont gérés par appelant
+        self.socket.settimeout(None)
+        self.healthy = True
+        self.commands_sent = 0
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._reader = threading.Thread(target=self._read_loop,
+                                        name="td-mux-reader", daemon=True)
+        self._reader.start()
+
+    def in_flight(self):
+        """Nombre de commandes en attente de réponse"""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def request(self, command, timeout=30.0):
+        """Envoyer une commande et attendre la réponse qui porte le même id"""
+        if not self.healthy:
+            raise ConnectionError("Multiplexed connection is closed")
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=timeout)
+        self.wait_stats.record(time.monotonic() - started)
+        if not acquired:
+            raise PoolTimeout("Too many commands in flight")
+        try:
+            request_id = next(self._ids)
+            pending = _PendingReply()
+            with self._pending_lock:
+                self._pending[request_id] = pending
+            try:
+                payload = encode_frame(self.codec.encode(dict(command, id=request_id)),
+                                       self.framing)
+                with tracing.span("send"), self._write_lock:
+                    sent_at = time.monotonic()
+                    self.socket.sendall(payload)
+                BYTES_SENT.inc(len(payload))
+                self.commands_sent += 1
+                with tracing.span("receive"):
+                    if not pending.event.wait(timeout):
+                        raise TimeoutError(f"No reply from TouchDesigner for request {request_id}")
+                ROUNDTRIP_SECONDS.observe(time.monotonic() - sent_at)
+                # Le décodage a eu lieu dans le thread lecteur
+                tracing.record_span("decode", pending.decode_seconds)
+            finally:
+                with self._pending_lock:
+                    self._pending.pop(request_id, None)
+            if pending.error is not None:
+                raise pending.error
+            return pending.response
+        finally:
+            self._slots.release()
+
+    def _dispatch_frame(self, frame):
+        """Router un message de réponse vers la commande correspondante"""
+        if not frame.strip():
+            return
+        BYTES_RECEIVED.inc(len(frame))
+        started = time.perf_counter()
+        try:
+            response = self.codec.decode(frame)
+        except CodecError:
+            logger.warning(f"Dropping undecodable multiplexed reply: {frame[:200]!r}")
+            return
+        decode_seconds = time.perf_counter() - started
+        request_id = response.pop("id", None) if isinstance(response, dict) else None
+        with self._pending_lock:
+            pending = self._pending.get(request_id)
+        if pending is None:
+            logger.warning(f"Dropping reply with unknown request id: {request_id}")
+            return
+        pending.response = response
+        pending.decode_seconds = decode_seconds
+        pending.event.set()
+
+    def _read_loop(self):
+        error = None
+        try:
+            while True:
+                self._dispatch_frame(self.reader.read_frame(self.socket))
+        except Exception as e:
+            error = e if isinstance(e, ConnectionError) else ConnectionError(str(e))
+            if self.healthy:
+                logger.error(f"Multiplexed reader stopped: {str(e)}")
+        finally:
+            self.healthy = False
+            with self._pending_lock:
+                pending = list(self._pending.values())
+            for reply in pending:
+                reply.error = error or ConnectionError("Connection closed")
+                reply.event.set()
+
+    def close(self):
+        """Fermer la connexion et réveiller les appelants en attente"""
+        self.healthy = False
+        if self.socket is not None:
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+
+
 class TouchDesignerConnector:
-    def __init__(self, host="localhost", port=7001):
+    """Pool de connexions vers TouchDesigner.
+
+    Chaque commande emprunte une connexion du pool puis la rend, de sorte que
+    plusieurs requêtes Flask peuvent dialoguer avec TouchDesigner en parallèle.
+    Avec multiplex=True, toutes les commandes partagent une seule connexion
+    multiplexée (voir MultiplexedConnection) ; TouchDesigner doit alors
+    recopier le champ "id" de chaque commande dans sa réponse.
+    """
+
+    def __init__(self, host="localhost", port=7001, pool_size=4, idle_timeout=60.0,
+                 connect_timeout=5.0, timeout=30.0, acquire_timeout=30.0,
+                 health_check_interval=5.0, multiplex=False, max_in_flight=64,
+                 framing=NEWLINE, max_frame_size=DEFAULT_MAX_FRAME_SIZE, codec="json"):
         self.host = host
         self.port = port
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.multiplex = multiplex
+        self.max_in_flight = max_in_flight
+        self.framing = framing
+        self.max_frame_size = max_frame_size
+        self.codec = codec
         self.connected = False
-        self.socket = None
-        self.lock = threading.Lock()
+        self._mux = None
+        self._mux_lock = threading.Lock()
+        self.lock = threading.Condition()
+        self._idle = deque()
+        self._open_count = 0
+        self._closed = False
+        # Connexions perdues pas encore remplacées (pour compter les reconnexions)
+        self._lost = 0
+        self.wait_stats = WaitStats()
         self.connect()
-    
+
+    def _open_connection(self):
+        """Ouvrir une nouvelle connexion (appelé hors du verrou)"""
+        conn = TDConnection(self.host, self.port,
+                            connect_timeout=self.connect_timeout, timeout=self.timeout,
+                            framing=self.framing, max_frame_size=self.max_frame_size,
+                            codec=self.codec)
+        CONNECTIONS_OPENED.inc()
+        with self.lock:
+            if self._lost > 0:
+                self._lost -= 1
+                RECONNECTS.inc()
+        self.connected = True
+        logger.info(f"Connected to TouchDesigner at {self.host}:{self.port}")
+        return conn
+
+    def _evict_idle_locked(self):
+        """Fermer les connexions inactives trop longtemps (verrou déjà pris)"""
+        kept = deque()
+        while self._idle:
+            conn = self._idle.popleft()
+            if self.idle_timeout is not None and conn.idle_time() > self.idle_timeout:
+                logger.debug(f"Evicting idle connection after {conn.idle_time():.1f}s")
+                conn.close()
+                self._open_count -= 1
+            else:
+                kept.append(conn)
+        self._idle = kept
+
     def connect(self):
         """Établir une connexion avec TouchDesigner"""
+        if self.multiplex:
+            try:
+                self._get_multiplexed()
+                return True
+            except Exception as e:
+                logger.error(f"Failed to connect to TouchDesigner: {str(e)}")
+                self.connected = False
+                return False
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            logger.info(f"Connected to TouchDesigner at {self.host}:{self.port}")
+            with self.lock:
+                if self._open_count >= self.pool_size:
+                    return self.connected
+                self._open_count += 1
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self.lock:
+                    self._open_count -= 1
+                    self.lock.notify()
+                raise
+            self.release(conn)
             return True
         except Exception as e:
             logger.error(f"Failed to connect to TouchDesigner: {str(e)}")
             self.connected = False
             return False
-    
+
     def is_connected(self):
         """Vérifier si la connexion est établie"""
         return self.connected
-    
+
     def reconnect_if_needed(self):
         """Reconnecter si la connexion est perdue"""
         if not self.is_connected():
             logger.info("Attempting to reconnect...")
             return self.connect()
         return True
-    
+
+    def _get_multiplexed(self):
+        """Retourner la connexion multiplexée, en la (re)créant si besoin"""
+        with self._mux_lock:
+            if self._mux is None or not self._mux.healthy:
+                if self._closed:
+                    raise ConnectionError("Connector is closed")
+                replacing = self._mux is not None
+                self._mux = MultiplexedConnection(self.host, self.port,
+                                                  connect_timeout=self.connect_timeout,
+                                                  max_in_flight=self.max_in_flight,
+                                                  framing=self.framing,
+                                                  max_frame_size=self.max_frame_size,
+                                                  codec=self.codec,
+                                                  wait_stats=self.wait_stats)
+                CONNECTIONS_OPENED.inc()
+                if replacing:
+                    RECONNECTS.inc()
+                self.connected = True
+                logger.info(f"Connected to TouchDesigner at {self.host}:{self.port} (multiplexed)")
+            return self._mux
+
+    def acquire(self, timeout=None):
+        """Emprunter une connexion au pool (en ouvrir une si nécessaire)"""
+        if timeout is None:
+            timeout = self.acquire_timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self.lock:
+            while True:
+                if self._closed:
+                    raise ConnectionError("Connector is closed")
+                self._evict_idle_locked()
+                while self._idle:
+                    # LIFO : la connexion la plus récente est la plus sûre
+                    conn = self._idle.pop()
+                    if conn.idle_time() < self.health_check_interval or conn.is_alive():
+                        self.wait_stats.record(time.monotonic() - started)
+                        return conn
+                    logger.info("Discarding dead pooled connection")
+                    conn.close()
+                    self._open_count -= 1
+                    self._lost += 1
+                if self._open_count < self.pool_size:
+                    self._open_count += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.wait_stats.record(time.monotonic() - started)
+                    raise PoolTimeout("Timed out waiting for a TouchDesigner connection")
+                self.lock.wait(remaining)
+        self.wait_stats.record(time.monotonic() - started)
+
+        try:
+            return self._open_connection()
+        except Exception:
+            self.connected = False
+            with self.lock:
+                self._open_count -= 1
+                self.lock.notify()
+            raise
+
+    def release(self, conn, healthy=True):
+        """Rendre une connexion au pool, ou la fermer si elle est défaillante"""
+        with self.lock:
+            if healthy and conn.healthy and not self._closed:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            else:
+                conn.close()
+                self._open_count -= 1
+                if not self._closed:
+                    self._lost += 1
+            self._evict_idle_locked()
+            self.lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Gestionnaire de contexte autour de acquire()/release()"""
+        conn = self.acquire(timeout)
+        healthy = False
+        try:
+            yield conn
+            healthy = True
+        except Exception:
+            conn.failures += 1
+            raise
+        finally:
+            self.release(conn, healthy=healthy)
+
+    def pool_stats(self):
+        """État courant du pool"""
+        if self.multiplex:
+            mux = self._mux
+            return {
+                "multiplex": True,
+                "open": 1 if mux is not None and mux.healthy else 0,
+                "in_flight": mux.in_flight() if mux is not None else 0,
+                "max_in_flight": self.max_in_flight,
+                "wait": self.wait_stats.snapshot(),
+            }
+        with self.lock:
+            return {
+                "pool_size": self.pool_size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "wait": self.wait_stats.snapshot(),
+            }
+
+    def close(self):
+        """Fermer toutes les connexions du pool"""
+        with self.lock:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open_count -= 1
+            self.lock.notify_all()
+        with self._mux_lock:
+            if self._mux is not None:
+                self._mux.close()
+                self._mux = None
+        self.connected = False
+
     def send_command(self, command):
         """Envoyer une commande à TouchDesigner"""
-        with self.lock:
+        IN_FLIGHT.inc()
+        try:
+            response = self._send_command(command)
+        finally:
+            IN_FLIGHT.dec()
+        # TouchDesigner peut indiquer son propre temps d'exécution
+        if isinstance(response, dict) and TD_EXEC_FIELD in response:
+            exec_ms = response.pop(TD_EXEC_FIELD)
+            if isinstance(exec_ms, (int, float)):
+                tracing.record_span("td_exec", exec_ms / 1000)
+        return response
+
+    def _send_command(self, command):
+        if self.multiplex:
             try:
-                if not self.reconnect_if_needed():
-                    return {"error": "Not connected to TouchDesigner"}
-                
-                # Ajouter un délimiteur de fin de commande
-                command_str = json.dumps(command) + "\n"
-                self.socket.sendall(command_str.encode('utf-8'))
-                
-                # Attendre et lire la réponse
-                response = ""
-                buffer = ""
-                while True:
-                    buffer = self.socket.recv(4096).decode('utf-8')
-                    if not buffer:
-                        break
-                    response += buffer
-                    if "\n" in buffer:  # Le délimiteur de fin a été reçu
-                        break
-                
-                # Analyser la réponse JSON
-                try:
-                    return json.loads(response.strip())
-                except json.JSONDecodeError:
-                    return {"raw_response": response.strip()}
-            
+                response = self._get_multiplexed().request(command, timeout=self.timeout)
+                self.connected = True
+                return response
+            except PoolTimeout as e:
+                COMMAND_ERRORS.inc()
+                logger.error(f"Error sending command: {str(e)}")
+                return {"error": str(e)}
             except Exception as e:
+                COMMAND_ERRORS.inc()
                 logger.error(f"Error sending command: {str(e)}")
-                self.connected = False
+                if self._mux is None or not self._mux.healthy:
+                    self.connected = False
                 return {"error": str(e)}
-    
+
+        try:
+            with self.connection() as conn:
+                response = conn.request(command)
+                codec = conn.codec
+            # Aller-retour réussi : TouchDesigner est joignable
+            self.connected = True
+
+            # Décoder la réponse avec le codec négocié pour cette connexion
+            try:
+                with tracing.span("decode"):
+                    return codec.decode(response)
+            except CodecError:
+                return {"raw_response": response.decode('utf-8', 'replace').strip()}
+
+        except PoolTimeout as e:
+            # Pool saturé : les connexions existantes fonctionnent
+            COMMAND_ERRORS.inc()
+            logger.error(f"Error sending command: {str(e)}")
+            return {"error": str(e)}
+        except Exception as e:
+            COMMAND_ERRORS.inc()
+            logger.error(f"Error sending command: {str(e)}")
+            self.connected = False
+            return {"error": str(e)}
+
     def execute_tool(self, tool_name, parameters):
         """Exécuter un outil spécifique dans TouchDesigner"""
         command = {
@@ -79,4 +627,40 @@ class TouchDesignerConnector:
             "tool_name": tool_name,
             "parameters": parameters
         }
-        return self.send_command(command)
\ No newline at end of file
+        return self.send_command(command)
+
+    def execute_batch(self, commands, stop_on_error=True):
+        """Exécuter une liste ordonnée d'outils en une seule commande TouchDesigner.
+
+        TouchDesigner exécute tous les outils dans la même frame et renvoie
+        {"results": [...]}, un résultat par outil. Si TouchDesigner répond que
+        l'action execute_batch est inconnue, les outils sont exécutés un par un ;
+        toute autre erreur est renvoyée pour chaque outil, sans nouvel envoi.
+        """
+        command = {
+            "action": "execute_batch",
+            "commands": [{"tool_name": c["tool_name"], "parameters": c.get("parameters") or {}}
+                         for c in commands],
+            "stop_on_error": stop_on_error
+        }
+        response = self.send_command(command)
+        if isinstance(response, dict) and isinstance(response.get("results"), list):
+            return response["results"]
+
+        if not is_unknown_action(response, "execute_batch"):
+            # Délai dépassé, connexion perdue... : TouchDesigner a pu exécuter
+            # le lot, le renvoyer outil par outil risquerait de tout rejouer
+            if isinstance(response, dict) and response.get("error"):
+                error = str(response["error"])
+            else:
+                error = "Invalid reply to execute_batch"
+            return [{"error": error} for _ in commands]
+
+        logger.warning("Batch command not supported by TouchDesigner, running tools one by one")
+        results = []
+        for c in command["commands"]:
+            result = self.execute_tool(c["tool_name"], c["parameters"])
+            results.append(result)
+            if stop_on_error and isinstance(result, dict) and "error" in result:
+                break
+        return results
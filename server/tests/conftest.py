@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Les modules du serveur s'importent à plat (import server, from tools import ...),
+# les modules partagés depuis la racine du dépôt (mcp_common)
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.append(os.path.dirname(SERVER_DIR))
+
+
+@pytest.fixture
+def client():
+    """Client HTTP de l'application Flask"""
+    import server
+    return server.app.test_client()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Commandes qui auraient été envoyées à TouchDesigner"""
+    import server
+    commands = []
+    monkeypatch.setattr(server.td_connector, "execute_tool",
+                        lambda tool_name, parameters: commands.append(tool_name) or {"success": True})
+    monkeypatch.setattr(server.td_connector, "execute_batch",
+                        lambda commands_, stop_on_error=True: commands.extend(commands_) or [])
+    return commands
@@ -0,0 +1,68 @@
+def test_tools_execute_returns_the_tool_result(client, sent):
+    response = client.post("/", json={"jsonrpc": "2.0", "id": 7, "method": "tools_execute",
+                                      "params": {"tool_name": "get_project_info", "parameters": {}}})
+    assert response.status_code == 200
+    assert response.get_json() == {"jsonrpc": "2.0", "id": 7, "result": {"result": {"success": True}}}
+    assert sent == ["get_project_info"]
+
+
+def test_resources_list_returns_every_tool(client):
+    reply = client.post("/", json={"jsonrpc": "2.0", "id": 1, "method": "resources_list"}).get_json()
+    assert {"id": "create_operator", "type": "tool"}.items() <= reply["result"][0].items()
+
+
+def test_notification_has_no_response(client):
+    response = client.post("/", json={"jsonrpc": "2.0", "method": "prompts_list"})
+    assert response.status_code == 204
+
+
+def test_invalid_json_is_a_parse_error(client):
+    response = client.post("/", data="{", content_type="application/json")
+    assert response.get_json()["error"]["code"] == -32700
+
+
+def test_batch_responses_follow_call_order(client, monkeypatch):
+    import server
+    monkeypatch.setattr(server.td_connector, "execute_tool",
+                        lambda tool_name, parameters: {"tool": tool_name})
+    calls = [
+        {"jsonrpc": "2.0", "id": 1, "method": "tools_execute",
+         "params": {"tool_name": "get_project_info", "parameters": {}}},
+        {"jsonrpc": "2.0", "id": 2, "method": "resources_list"},
+        {"jsonrpc": "2.0", "method": "prompts_list"},
+        {"jsonrpc": "2.0", "id": 3, "method": "tools_execute",
+         "params": {"tool_name": "create_operator", "parameters": {"operator_type": "noise"}}},
+        {"jsonrpc": "2.0", "id": 4, "method": "tools_execute",
+         "params": {"tool_name": "get_project_info", "parameters": {}}},
+    ]
+    replies = client.post("/", json=calls).get_json()
+    assert [reply["id"] for reply in replies] == [1, 2, 3, 4]
+    assert replies[0]["result"] == {"result": {"tool": "get_project_info"}}
+    assert replies[2]["result"] == {"result": {"tool": "create_operator"}}
+
+
+def test_tools_execute_batch_returns_one_result_per_command(client, monkeypatch):
+    import server
+    monkeypatch.setattr(server.td_connector, "execute_batch",
+                        lambda commands, stop_on_error=True: [{"ok": 1}, {"error": "boom"}])
+    reply = client.post("/", json={"jsonrpc": "2.0", "id": 1, "method": "tools_execute_batch", "params": {
+        "commands": [{"tool_name": "get_project_info"},
+                     {"tool_name": "delete_operator", "parameters": {"operator_path": "/a"}},
+                     {"tool_name": "get_project_info"}],
+    }}).get_json()
+    assert reply["result"] == {
+        "results": [
+            {"index": 0, "tool_name": "get_project_info", "status": "ok", "result": {"ok": 1}},
+            {"index": 1, "tool_name": "delete_operator", "status": "error", "error": "boom"},
+            {"index": 2, "tool_name": "get_project_info", "status": "skipped"},
+        ],
+        "completed": 2,
+        "failed": 1,
+    }
+
+
+def test_tools_execute_batch_rejects_malformed_commands(client, sent):
+    reply = client.post("/", json={"jsonrpc": "2.0", "id": 1, "method": "tools_execute_batch",
+                                   "params": {"commands": [{"parameters": {}}]}}).get_json()
+    assert reply["error"] == {"code": -32602, "message": "commands[0] must have a tool_name"}
+    assert sent == []
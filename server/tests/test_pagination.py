@@ -0,0 +1,26 @@
+from pagination import paginate_project_info
+
+
+OPERATORS = [
+    {"name": "noise1", "type": "noise", "family": "TOP"},
+    {"name": "noise2", "type": "noise", "family": "CHOP"},
+    {"name": "noise3", "type": "noise", "family": "TOP"},
+    {"name": "text1", "type": "text", "family": "TOP"},
+]
+
+
+def test_class_name_filter_matches_touchdesigner_types():
+    page = paginate_project_info({"operators": OPERATORS}, {"operator_type": "noiseTOP", "limit": 1})
+    assert page["operators"] == [OPERATORS[0]]
+    assert page["total_operators"] == 2
+
+    cursor = page["next_cursor"]
+    page = paginate_project_info({"operators": OPERATORS},
+                                 {"operator_type": "noiseTOP", "limit": 1, "cursor": cursor})
+    assert page["operators"] == [OPERATORS[2]]
+    assert page["next_cursor"] is None
+
+
+def test_paginated_replies_from_touchdesigner_are_passed_through():
+    reply = {"operators": OPERATORS[:1], "next_cursor": "abc"}
+    assert paginate_project_info(reply, {"limit": 10}) is reply
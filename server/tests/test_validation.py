@@ -0,0 +1,37 @@
+from tools import TOOL_REGISTRY
+
+
+def call(client, method, params):
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    return client.post("/", json=request).get_json()
+
+
+def test_registry_reports_every_invalid_field():
+    errors = TOOL_REGISTRY.validate("create_operator", {"operator_type": "cube", "position": {"x": "a"}})
+    assert errors == [
+        'parameters.operator_type: "cube" is not one of "circle", "box", "noise", "text", '
+        '"movie", "constant", "null", "feedback"',
+        "parameters.position.x: expected number, got string",
+    ]
+    assert TOOL_REGISTRY.validate("connect_operators", {"source_path": "/a"}) == [
+        "parameters.destination_path: required field is missing",
+    ]
+    assert TOOL_REGISTRY.validate("unknown_tool", {"anything": 1}) == []
+
+
+def test_tools_execute_rejects_bad_params_locally(client, sent):
+    reply = call(client, "tools_execute", {"tool_name": "create_operator", "parameters": {"operator_type": "cube"}})
+    assert reply["error"]["code"] == -32602
+    assert 'parameters.operator_type: "cube" is not one of' in reply["error"]["message"]
+    assert sent == []
+
+
+def test_tools_execute_batch_rejects_bad_params_locally(client, sent):
+    reply = call(client, "tools_execute_batch", {"commands": [
+        {"tool_name": "create_operator", "parameters": {"operator_type": "circle"}},
+        {"tool_name": "get_parameter", "parameters": {"operator_path": "/circle1"}},
+    ]})
+    assert reply["error"]["code"] == -32602
+    assert "commands[1] (get_parameter): parameters.parameter_name: required field is missing" \
+        in reply["error"]["message"]
+    assert sent == []
@@ -1,14 +1,79 @@
+import hashlib
+import json
+from types import MappingProxyType
+
 from .operator_tools import get_operator_tools
 from .parameter_tools import get_parameter_tools
 from .project_tools import get_project_tools
+from .validation import compile_schema, validate
 
-def get_all_tools():
-    """Récupérer tous les outils disponibles"""
+
+def _freeze(value):
+    """Copie en lecture seule d'une définition (dictionnaires et listes imbriqués)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _serialize(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ToolRegistry:
+    """Registre figé des outils, construit une seule fois au démarrage.
+
+    Les définitions sont en lecture seule et déjà sérialisées : servir la
+    liste des outils ne coûte qu'une comparaison d'ETag ou une copie d'octets.
+    """
+
+    def __init__(self, tools):
+        self.tools = tuple(_freeze(tool) for tool in tools)
+        self.by_name = MappingProxyType({tool["name"]: tool for tool in self.tools})
+        self.names = frozenset(self.by_name)
+        self.read_only = frozenset(tool["name"] for tool in self.tools
+                                   if tool.get("annotations", {}).get("readOnlyHint"))
+        # Corps JSON de /mcp/tools et son empreinte (ETag)
+        self.json_bytes = _serialize(tools)
+        self.etag = hashlib.sha256(self.json_bytes).hexdigest()[:32]
+        # Validateurs compilés une fois, par nom d'outil
+        self.validators = MappingProxyType({tool["name"]: compile_schema(tool.get("parameters", {}))
+                                            for tool in tools})
+        # Ressources exposées par resources_list
+        self.resources = tuple(MappingProxyType({"id": tool["name"], "name": tool["description"], "type": "tool"})
+                               for tool in tools)
+
+    def validate(self, tool_name, parameters):
+        """Erreurs de validation des paramètres d'un appel (vide si valide).
+
+        Les outils sans définition ne sont pas validés : TouchDesigner peut en
+        proposer d'autres que ceux déclarés ici.
+        """
+        validator = self.validators.get(tool_name)
+        if validator is None:
+            return []
+        return validate(validator, parameters)
+
+    def resource_list(self):
+        """Ressources sous forme sérialisable (les vues figées ne le sont pas)"""
+        return [dict(resource) for resource in self.resources]
+
+
+def _build_registry():
     tools = []
-    
+
     # Combiner tous les outils des différents modules
     tools.extend(get_operator_tools())
     tools.extend(get_parameter_tools())
     tools.extend(get_project_tools())
-    
-    return tools
\ No newline at end of file
+
+    return ToolRegistry(tools)
+
+
+TOOL_REGISTRY = _build_registry()
+
+
+def get_all_tools():
+    """Récupérer tous les outils disponibles (copie modifiable du registre)"""
+    return json.loads(TOOL_REGISTRY.json_bytes)
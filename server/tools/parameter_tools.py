@@ -26,6 +26,7 @@ def get_parameter_tools():
         {
             "name": "get_parameter",
             "description": "Get a parameter value from an operator",
+            "annotations": {"readOnlyHint": True},
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -105,6 +105,7 @@ def get_project_tools():
         {
             "name": "get_project_info",
             "description": "Get information about the current project",
+            "annotations": {"readOnlyHint": True},
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -112,6 +113,29 @@ def get_project_tools():
                         "type": "boolean",
                         "description": "Whether to include operator list",
                         "default": False
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of operators per page (default: all)",
+                        "minimum": 1
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor returned as next_cursor by the previous page"
+                    },
+                    "fields": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Operator fields to return, e.g. [\"path\", \"type\"] (default: all)"
+                    },
+                    "family": {
+                        "type": "string",
+                        "description": "Only list operators of this family",
+                        "enum": ["COMP", "TOP", "CHOP", "SOP", "DAT", "MAT", "POP"]
+                    },
+                    "operator_type": {
+                        "type": "string",
+                        "description": "Only list operators of this type (e.g. noise or noiseTOP)"
                     }
                 }
             }
@@ -0,0 +1,109 @@
+import json
+
+# Types JSON Schema pris en charge ; bool est un int en Python, d'où les exclusions
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+                             or (isinstance(value, float) and value.is_integer()),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "null": lambda value: value is None,
+}
+
+
+def _json_type(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _show(value, limit=80):
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def compile_schema(schema):
+    """Compiler un schéma JSON en fonction validate(value, path, errors).
+
+    Seuls les mots-clés utilisés par les définitions d'outils sont pris en
+    charge : type, enum, required, properties, items, minimum et maximum. Les
+    propriétés non déclarées sont acceptées, comme le veut JSON Schema. Tout
+    ce qui peut l'être est calculé ici, une fois, pour que la validation d'un
+    appel se limite à des tests de type et d'appartenance.
+    """
+    type_names = schema.get("type")
+    type_checks = None
+    if type_names is not None:
+        if isinstance(type_names, str):
+            type_names = [type_names]
+        unknown = [name for name in type_names if name not in _TYPE_CHECKS]
+        if unknown:
+            raise ValueError(f"Unsupported schema type(s): {unknown}")
+        type_checks = tuple(_TYPE_CHECKS[name] for name in type_names)
+        expected = " or ".join(type_names)
+
+    enum = schema.get("enum")
+    if enum is not None:
+        enum_text = ", ".join(_show(item) for item in enum)
+        try:
+            enum = frozenset(enum)
+        except TypeError:
+            enum = tuple(enum)
+
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    required = tuple(schema.get("required", ()))
+    properties = tuple((name, compile_schema(subschema))
+                       for name, subschema in schema.get("properties", {}).items())
+    items = compile_schema(schema["items"]) if "items" in schema else None
+
+    def validate(value, path, errors):
+        if type_checks is not None and not any(check(value) for check in type_checks):
+            errors.append(f"{path}: expected {expected}, got {_json_type(value)}")
+            return
+        if enum is not None:
+            try:
+                known = value in enum
+            except TypeError:
+                known = False
+            if not known:
+                errors.append(f"{path}: {_show(value)} is not one of {enum_text}")
+        if minimum is not None or maximum is not None:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if minimum is not None and value < minimum:
+                    errors.append(f"{path}: {value} is less than the minimum {minimum}")
+                if maximum is not None and value > maximum:
+                    errors.append(f"{path}: {value} is greater than the maximum {maximum}")
+        if isinstance(value, dict):
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}.{name}: required field is missing")
+            for name, validate_property in properties:
+                if name in value:
+                    validate_property(value[name], f"{path}.{name}", errors)
+        elif items is not None and isinstance(value, list):
+            for index, item in enumerate(value):
+                items(item, f"{path}[{index}]", errors)
+
+    return validate
+
+
+def validate(validator, value, path="parameters"):
+    """Liste des erreurs de validation (vide si la valeur est valide)"""
+    errors = []
+    validator(value, path, errors)
+    return errors
@@ -1,14 +1,24 @@
 from typing import Any, Dict, List, Optional, Union
+import asyncio
 import subprocess
 import socket
 import json
 import time
 import os
-import urllib.request
+import sys
+import queue
+import select
+import threading
+import http.client
 import urllib.parse
 import json
 from mcp.server.fastmcp import FastMCP
 
+# Modules shared by both FastMCP servers live in mcp_common/ at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_common.parameters import normalize_parameter_writes
+from mcp_common.screenshot import check_image_options, encode_image_command, save_screenshot_command
+from mcp_common.tracing import record_span, span, traced
 
 # Initialize FastMCP server for controlling TouchDesigner
 mcp = FastMCP("touchdesigner_control")
@@ -17,6 +27,9 @@ mcp = FastMCP("touchdesigner_control")
 DEFAULT_TOUCHDESIGNER_PATH = r"C:\Program Files\Derivative\TouchDesigner\bin\TouchDesigner.exe"
 DEFAULT_PORT = 9980  # Default TouchDesigner Python port
 DEFAULT_PROJECT_NAME = "project1"  # Default project name
+HTTP_POOL_SIZE = int(os.environ.get("TD_HTTP_POOL_SIZE", 4))  # Concurrent (kept-alive) connections to the TD web server
+HTTP_TIMEOUT = float(os.environ.get("TD_HTTP_TIMEOUT", 30))  # Seconds, per request
+HTTP_READ_CHUNK_SIZE = 64 * 1024  # Bytes read at a time from (possibly chunked) responses
 
 # Global connection state
 connection = {
@@ -51,38 +64,144 @@ def disconnect_from_touchdesigner() -> bool:
             pass
     connection["td_socket"] = None
     connection["connected"] = False
+    for pool in http_pools.values():
+        pool.close()
     return True
 
+class HTTPConnectionPool:
+    """Keep-alive HTTP connections to the TouchDesigner web server.
+
+    At most `size` requests are in flight at once; further requests wait up to
+    `timeout` seconds for a free connection.
+    """
+
+    def __init__(self, host: str, port: int, size: int = HTTP_POOL_SIZE, timeout: float = HTTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+        self.post_supported = True
+
+    def _get(self) -> tuple:
+        """Return (connection, reused), skipping idle connections the server has closed."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+            # An idle keep-alive socket is only readable once the server closed it
+            if conn.sock is not None and not select.select([conn.sock], [], [], 0)[0]:
+                return conn, True
+            conn.close()
+
+    def _put(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> tuple:
+        """Send a request and return (status, body bytes), reusing an idle connection."""
+        headers = dict(headers or {}, Connection="keep-alive")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Timed out waiting for a connection to the TouchDesigner web server")
+        try:
+            for attempt in range(2):
+                conn, reused = self._get()
+                sent = False
+                try:
+                    with span("send"):
+                        conn.request(method, path, body=body, headers=headers)
+                    sent = True
+                    with span("receive"):
+                        response = conn.getresponse()
+                        # http.client decodes chunked transfer-encoding transparently
+                        data = bytearray()
+                        chunk = response.read(HTTP_READ_CHUNK_SIZE)
+                        while chunk:
+                            data += chunk
+                            chunk = response.read(HTTP_READ_CHUNK_SIZE)
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    # Retry only when a reused connection failed before the whole request was
+                    # sent: TouchDesigner cannot have run it. Once sent, the script may have run.
+                    if attempt == 0 and reused and not sent:
+                        continue
+                    raise
+                except Exception:
+                    conn.close()
+                    raise
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._put(conn)
+                return response.status, bytes(data)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+# One pool per TouchDesigner web server
+http_pools: Dict[tuple, HTTPConnectionPool] = {}
+
+def get_http_pool(host: str, port: int) -> HTTPConnectionPool:
+    """Return the keep-alive pool for a TouchDesigner web server."""
+    pool = http_pools.get((host, port))
+    if pool is None:
+        pool = http_pools[(host, port)] = HTTPConnectionPool(host, port)
+    return pool
+
 def send_python_command(command: str, port: int = 9980) -> dict:
     """Send a Python command to TouchDesigner via HTTP and get the result."""
-    url = f"http://localhost:{port}/api/run"
+    pool = get_http_pool(connection["host"], port)
     
     # Remplacer 'geo' par 'geometry' s'il est présent dans la commande
     if "geo" in command:
         command = command.replace("geo", "geometry")
 
-    params = {"script": command}
-    query = urllib.parse.urlencode(params)
-
     try:
-        with urllib.request.urlopen(f"{url}?{query}") as response:
-            response_text = response.read().decode().strip()
+        # The script travels in the POST body: no URL length limit and no re-encoding
+        status = None
+        if pool.post_supported:
+            body = json.dumps({"script": command}).encode('utf-8')
+            status, data = pool.request("POST", "/api/run", body=body,
+                                        headers={"Content-Type": "application/json"})
+            if status in (404, 405, 501):
+                # Older TouchDesigner web server scripts only handle GET
+                pool.post_supported = False
+        if not pool.post_supported:
+            query = urllib.parse.urlencode({"script": command})
+            status, data = pool.request("GET", f"/api/run?{query}")
+        if status >= 400:
+            raise RuntimeError(f"HTTP Error {status}: {data.decode(errors='replace').strip()}")
+        response_text = data.decode().strip()
             
-            # Essaye de parser comme JSON si possible
-            try:
+        # Essaye de parser comme JSON si possible
+        try:
+            with span("decode"):
                 response_data = json.loads(response_text)
-                return {
-                    "success": response_data.get("error") is None,
-                    "result": response_data.get("result"),
-                    "error": response_data.get("error")
-                }
-            except json.JSONDecodeError:
-                # Retour brut si pas de JSON
-                return {
-                    "success": True,
-                    "result": response_text,
-                    "error": None
-                }
+            # Execution time, if the TouchDesigner web server script reports it
+            if isinstance(response_data.get("exec_ms"), (int, float)):
+                record_span("td_exec", response_data["exec_ms"] / 1000)
+            return {
+                "success": response_data.get("error") is None,
+                "result": response_data.get("result"),
+                "error": response_data.get("error")
+            }
+        except json.JSONDecodeError:
+            # Retour brut si pas de JSON
+            return {
+                "success": True,
+                "result": response_text,
+                "error": None
+            }
     except Exception as e:
         return {
             "success": False,
@@ -91,6 +210,7 @@ def send_python_command(command: str, port: int = 9980) -> dict:
         }
     
 @mcp.tool()
+@traced
 async def launch_touchdesigner(path: Optional[str] = None, project: Optional[str] = None) -> Dict[str, Any]:
     """Launch TouchDesigner application.
     
@@ -138,6 +258,7 @@ async def launch_touchdesigner(path: Optional[str] = None, project: Optional[str
         return result
 
 @mcp.tool()
+@traced
 async def connect(host: str = "localhost", port: int = DEFAULT_PORT) -> Dict[str, Any]:
     """Connect to a running TouchDesigner instance.
     
@@ -161,6 +282,7 @@ async def connect(host: str = "localhost", port: int = DEFAULT_PORT) -> Dict[str
     return result
 
 @mcp.tool()
+@traced
 async def disconnect() -> Dict[str, Any]:
     """Disconnect from TouchDesigner."""
     result = {"success": False, "message": ""}
@@ -175,13 +297,14 @@ async def disconnect() -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def close_touchdesigner() -> Dict[str, Any]:
     """Close the TouchDesigner application."""
     result = {"success": False, "message": ""}
     
     if connection["connected"]:
         # Try to close gracefully first
-        command_result = send_python_command("op.quit()")
+        command_result = await asyncio.to_thread(send_python_command, "op.quit()")
         disconnect_from_touchdesigner()
         
         # If process was launched by us, make sure it's terminated
@@ -204,6 +327,7 @@ async def close_touchdesigner() -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def execute_python(code: str) -> Dict[str, Any]:
     """Execute arbitrary Python code in TouchDesigner.
     
@@ -216,7 +340,7 @@ async def execute_python(code: str) -> Dict[str, Any]:
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command_result = send_python_command(code)
+    command_result = await asyncio.to_thread(send_python_command, code)
     result["success"] = command_result["success"]
     result["result"] = command_result["result"]
     
@@ -228,6 +352,7 @@ async def execute_python(code: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
     """Save the current TouchDesigner project.
     
@@ -246,7 +371,7 @@ async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
         else:
             command = 'op.project.save()'
         
-        command_result = send_python_command(command)
+        command_result = await asyncio.to_thread(send_python_command, command)
         result["success"] = command_result["success"]
         
         if result["success"]:
@@ -262,6 +387,7 @@ async def save_project(path: Optional[str] = None) -> Dict[str, Any]:
         return result
 
 @mcp.tool()
+@traced
 async def create_operator(op_type: str, op_name: str, name: str) -> Dict[str, Any]:
     """Create a new operator in TouchDesigner.
     
@@ -279,7 +405,7 @@ async def create_operator(op_type: str, op_name: str, name: str) -> Dict[str, An
     
     # exemple command : op("/project1").create(geometryCOMP, "geo1")
     command = f'op("/{DEFAULT_PROJECT_NAME}").create({op_name}{op_type}, "{name}")'
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -291,6 +417,7 @@ async def create_operator(op_type: str, op_name: str, name: str) -> Dict[str, An
     return result
 
 @mcp.tool()
+@traced
 async def delete_operator(op_path: str) -> Dict[str, Any]:
     """Delete an operator in TouchDesigner.
     
@@ -304,7 +431,7 @@ async def delete_operator(op_path: str) -> Dict[str, Any]:
         return result
     
     command = f'op("{op_path}").destroy()'
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -315,6 +442,7 @@ async def delete_operator(op_path: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, Any]:
     """Set a parameter value on an operator.
     
@@ -338,7 +466,7 @@ async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, A
         formatted_value = str(value)
     
     command = f'op("{op_path}").par.{parameter} = {formatted_value}'
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -349,6 +477,62 @@ async def set_parameter(op_path: str, parameter: str, value: Any) -> Dict[str, A
     return result
 
 @mcp.tool()
+@traced
+async def set_parameters(parameters: Union[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Set many parameter values in a single TouchDesigner script execution.
+    
+    All writes are applied in the same frame, so the operators cook once.
+    
+    Args:
+        parameters: Either a list of {"op_path", "parameter", "value"} entries
+            or a nested {op_path: {parameter: value}} map
+    """
+    result = {"success": False, "message": "", "applied": 0, "failed": 0, "errors": []}
+    
+    if not connection["connected"]:
+        result["message"] = "Not connected to TouchDesigner"
+        return result
+    
+    try:
+        entries = normalize_parameter_writes(parameters)
+    except (KeyError, TypeError, AttributeError) as e:
+        result["message"] = f"Invalid parameters: expected a list of {{op_path, parameter, value}} or a {{op_path: {{parameter: value}}}} map ({e})"
+        return result
+    
+    command = f"""
+__statuses = []
+for __op_path, __parameter, __value in {entries!r}:
+    try:
+        setattr(op(__op_path).par, __parameter, __value)
+        __statuses.append(None)
+    except Exception as e:
+        __statuses.append(str(e))
+__statuses
+"""
+    command_result = await asyncio.to_thread(send_python_command, command)
+    
+    if not command_result["success"]:
+        result["message"] = f"Failed to set parameters: {command_result['error']}"
+        return result
+    
+    # One status per entry: None when applied, the error message otherwise
+    statuses = command_result["result"]
+    if not isinstance(statuses, list) or len(statuses) != len(entries):
+        result["message"] = f"Unexpected reply from TouchDesigner: {statuses}"
+        return result
+    for index, (entry, error) in enumerate(zip(entries, statuses)):
+        if error is None:
+            result["applied"] += 1
+        else:
+            result["errors"].append({"index": index, "op_path": entry[0], "parameter": entry[1], "error": error})
+    result["failed"] = len(result["errors"])
+    result["success"] = result["failed"] == 0
+    result["message"] = f"Set {result['applied']} of {len(entries)} parameters"
+    
+    return result
+
+@mcp.tool()
+@traced
 async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
     """Get a parameter value from an operator.
     
@@ -363,7 +547,7 @@ async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
         return result
     
     command = f'op("{op_path}").par.{parameter}.eval()'
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -375,6 +559,7 @@ async def get_parameter(op_path: str, parameter: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def list_operators(parent_path: str = "/") -> Dict[str, Any]:
     """List all operators under a specified path.
     
@@ -394,7 +579,7 @@ async def list_operators(parent_path: str = "/") -> Dict[str, Any]:
    "valid": child.valid}} 
  for child in op("{parent_path}").findChildren(depth=1)]
 """
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -406,6 +591,7 @@ async def list_operators(parent_path: str = "/") -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def cook_operator(op_path: str) -> Dict[str, Any]:
     """Force an operator to cook (update).
     
@@ -419,7 +605,7 @@ async def cook_operator(op_path: str) -> Dict[str, Any]:
         return result
     
     command = f'op("{op_path}").cook(force=True)'
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"]:
         result["success"] = True
@@ -430,6 +616,7 @@ async def cook_operator(op_path: str) -> Dict[str, Any]:
     return result
 
 @mcp.tool()
+@traced
 async def get_operator_info(op_path: str) -> Dict[str, Any]:
     """Get detailed information about an operator.
     
@@ -465,7 +652,7 @@ if operator.valid:
 else:
     None
 """
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"] and command_result["result"] is not None:
         result["success"] = True
@@ -477,6 +664,7 @@ else:
     return result
 
 @mcp.tool()
+@traced
 async def export_movie(comp_path: str, output_path: str, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Export a movie from a TouchDesigner component.
     
@@ -523,7 +711,7 @@ if movie.valid:
 else:
     "Invalid component path"
 """
-    command_result = send_python_command(command)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"] and command_result["result"] == "Success":
         result["success"] = True
@@ -534,13 +722,25 @@ else:
     return result
 
 @mcp.tool()
-async def take_screenshot(output_path: str, width: int = 1920, height: int = 1080) -> Dict[str, Any]:
-    """Take a screenshot of the current TouchDesigner window.
+@traced
+async def take_screenshot(output_path: Optional[str] = None, width: int = 1920, height: int = 1080,
+                          operator_path: Optional[str] = None, image_format: str = "jpeg",
+                          quality: int = 85, max_size: int = 512,
+                          crop: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Take a screenshot of the current TouchDesigner network view or of a TOP.
+    
+    Without output_path, the same capture is cropped, downscaled and encoded inside
+    TouchDesigner and returned base64-encoded in "image" instead of being saved.
     
     Args:
-        output_path: Output file path
-        width: Screenshot width (default: 1920)
-        height: Screenshot height (default: 1080)
+        output_path: Output file path (omit to get the image back in memory)
+        width: Width of the network view capture (default: 1920)
+        height: Height of the network view capture (default: 1080)
+        operator_path: TOP to capture instead of the network view
+        image_format: "jpeg" or "png", in memory (default: jpeg)
+        quality: JPEG quality from 1 to 100, in memory (default: 85)
+        max_size: Longest side of the returned image in pixels, never upscaled (default: 512)
+        crop: Region to keep, as {"x", "y", "width", "height"} fractions of the image from its top left corner
     """
     result = {"success": False, "message": ""}
     
@@ -548,14 +748,26 @@ async def take_screenshot(output_path: str, width: int = 1920, height: int = 108
         result["message"] = "Not connected to TouchDesigner"
         return result
     
-    command = f"""
-try:
-    ui.viewportImage(asImage=True).save("{output_path}", width={width}, height={height})
-    "Success"
-except Exception as e:
-    str(e)
-"""
-    command_result = send_python_command(command)
+    if output_path is None:
+        error = check_image_options(image_format, quality, max_size, crop)
+        if error:
+            result["message"] = error
+            return result
+        command = encode_image_command({"operator_path": operator_path, "width": width, "height": height,
+                                        "image_format": image_format, "quality": quality,
+                                        "max_size": max_size, "crop": crop})
+        command_result = await asyncio.to_thread(send_python_command, command)
+        if command_result["success"] and isinstance(command_result["result"], dict):
+            image = command_result["result"]
+            result["success"] = True
+            result["image"] = image
+            result["message"] = f"Captured a {image['width']}x{image['height']} {image_format} image ({image['bytes']} bytes)"
+        else:
+            result["message"] = f"Failed to take screenshot: {command_result['error'] or command_result['result']}"
+        return result
+    
+    command = save_screenshot_command(output_path, width, height, operator_path)
+    command_result = await asyncio.to_thread(send_python_command, command)
     
     if command_result["success"] and command_result["result"] == "Success":
         result["success"] = True